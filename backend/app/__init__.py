@@ -1,20 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import logging
-from app.api.routes import video_router, health_router
+from app.api.routes import video_router, health_router, search_router, download_router, metrics_router, instrument_requests, populate_shared_index
+from app.services.models import models
+from app.config import MODEL_WARMUP_ENABLED
 from dotenv import load_dotenv
+import asyncio
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models in the background so the server binds without waiting on them
+    warm_up = asyncio.create_task(models.warm_up()) if MODEL_WARMUP_ENABLED else None
+    # Fill the cross-video index from the on-disk cache once the server is up
+    await populate_shared_index()
+    yield
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+
 # Initialize FastAPI app
 def create_app():
     app = FastAPI(
         title="YouTube RAG Chat API",
         description="A FastAPI backend for chatting with YouTube video content using RAG",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     # CORS middleware for allowing frontend requests
@@ -24,11 +39,19 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Lets the extension read per-stage timings (SERVER_TIMING_ENABLED or X-Debug-Timing)
+        expose_headers=["Server-Timing"],
     )
 
+    # Request counts, latencies and the optional Server-Timing header
+    app.middleware("http")(instrument_requests)
+
     # Include routers
     app.include_router(video_router, tags=["videos"])
     app.include_router(health_router, tags=["health"])
+    app.include_router(search_router, tags=["search"])
+    app.include_router(download_router, tags=["downloads"])
+    app.include_router(metrics_router, tags=["metrics"])
 
     return app
 
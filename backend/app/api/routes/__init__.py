@@ -1,2 +1,5 @@
 from .health import health_router
-from .video import video_router
\ No newline at end of file
+from .video import video_router
+from .search import search_router, populate_shared_index
+from .download import download_router
+from .metrics import metrics_router, instrument_requests
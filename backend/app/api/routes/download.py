@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from app.schemas.video import DownloadRequest, DownloadResponse
+from app.services.downloads import download_jobs, submit_download, download_type_of
+from app.services.jobs import Job
+from datetime import datetime
+import logging
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+download_router = APIRouter()
+
+
+def download_response(job: Job) -> DownloadResponse:
+    result = job.result or {}
+    return DownloadResponse(
+        status=job.status,
+        title=result.get("title"),
+        file_path=result.get("file_path"),
+        download_type=download_type_of(job),
+        error=job.error,
+        timestamp=datetime.now().isoformat(),
+        job_id=job.id,
+        stage=job.stage,
+        progress={key: value for key, value in job.progress.items() if isinstance(value, (int, float))}
+    )
+
+
+@download_router.post("/download", response_model=DownloadResponse)
+async def download(request: DownloadRequest):
+    """Start downloading a video or its audio; poll the job or follow it over WebSocket"""
+    video_id = request.video_id.strip()
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Video ID is required")
+    
+    job = submit_download(video_id, request.download_type, request.output_path)
+    logger.info(f"Download job {job.id} for {request.download_type} of video {video_id} is {job.status}")
+    return download_response(job)
+
+
+@download_router.get("/downloads/{job_id}", response_model=DownloadResponse)
+async def get_download(job_id: str):
+    """Report the status and progress of a download"""
+    job = download_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Download not found")
+    return download_response(job)
+
+
+@download_router.websocket("/ws/downloads/{job_id}")
+async def download_progress(websocket: WebSocket, job_id: str):
+    """Stream a download's progress until it completes or fails"""
+    await websocket.accept()
+    job = download_jobs.get(job_id)
+    if job is None:
+        await websocket.send_json({"error": "Download not found"})
+        await websocket.close(code=4404)
+        return
+    
+    # yt-dlp reports progress from a download thread; hand each update to this connection's loop
+    updates: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    listener = lambda job: loop.call_soon_threadsafe(updates.put_nowait, download_response(job))
+    job.add_listener(listener)
+    try:
+        update = download_response(job)
+        while True:
+            await websocket.send_json(update.model_dump())
+            if update.status in ("completed", "failed"):
+                break
+            update = await updates.get()
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Client stopped following download {job_id}")
+    finally:
+        job.remove_listener(listener)
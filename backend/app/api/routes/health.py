@@ -1,5 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
+import asyncio
 
 health_router = APIRouter()
 @health_router.get("/")
@@ -11,14 +13,50 @@ async def read_root():
         "timestamp": datetime.now().isoformat()
     }
 
+@health_router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving HTTP"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@health_router.get("/health/ready")
+async def readiness():
+    """Readiness probe: models are loaded and requests won't wait on warm-up"""
+    from app.services.models import models
+    stats = models.stats()
+    body = {"status": "ready" if models.ready else stats["state"], "models": stats, "timestamp": datetime.now().isoformat()}
+    return body if models.ready else JSONResponse(status_code=503, content=body)
+
 @health_router.get("/health")
 async def health_check():
     """Detailed health check"""
-    from app.services.rag import embeddings, model
+    from app.services.models import models
+    from app.services.registry import processed_videos
+    from app.services.index_store import index_store
+    from app.api.routes.video import video_builds
+    from app.services.jobs import ingest_jobs
+    from app.services.answer_cache import answer_cache
+    from app.services.shared_index import shared_index
+    from app.services.video_state import video_states
+    from app.services.conversation import conversations
+    from app.services import metrics, admission
     return {
         "status": "healthy",
-        "embeddings_loaded": embeddings is not None,
-        "model_loaded": model is not None,
-        "processed_videos": 0,
+        "ready": models.ready,
+        "models": models.stats(),
+        "embeddings_loaded": models.embeddings is not None,
+        "model_loaded": models.llm is not None,
+        "processed_videos": len(processed_videos),
+        "memory": processed_videos.stats(),
+        "index_cache_bytes": await asyncio.to_thread(index_store.total_bytes),
+        "video_builds": video_builds.stats(),
+        "ingest_jobs": ingest_jobs.stats(),
+        "video_states": await asyncio.to_thread(video_states.stats),
+        "answer_cache": answer_cache.stats(),
+        "conversations": conversations.stats(),
+        "chat_stages": metrics.chat_stage_stats(),
+        "admission": admission.stats(),
+        "shared_index": shared_index.stats(),
+        "embedding_cache": models.embeddings.stats() if models.embeddings is not None else None,
+        "embedding_batcher": models.embedding_batcher.stats() if models.embedding_batcher is not None else None,
         "timestamp": datetime.now().isoformat()
     }
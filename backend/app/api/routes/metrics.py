@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import registry, request_timings, record_error, STAGE_SECONDS_BUCKETS
+from app.services.registry import processed_videos
+from app.services.index_store import index_store
+from app.services.answer_cache import answer_cache
+from app.services.shared_index import shared_index
+from app.services.conversation import conversations
+from app.services.jobs import ingest_jobs
+from app.services.downloads import download_jobs
+from app.services.models import models
+from app.services.admission import chat_gate, ingest_gate, chat_rate, ingest_rate
+from app.config import SERVER_TIMING_ENABLED
+import asyncio
+import time
+
+metrics_router = APIRouter()
+
+# Request header asking for Server-Timing on one response when it is off by default
+DEBUG_TIMING_HEADER = "X-Debug-Timing"
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Time until the response headers were sent", STAGE_SECONDS_BUCKETS, ("method", "route")
+)
+
+# Read from each service's own bookkeeping at scrape time
+registry.callback("resident_videos", "Videos held in memory", lambda: len(processed_videos))
+registry.callback("resident_video_bytes", "Estimated memory used by resident videos", lambda: processed_videos.stats()["memory_bytes"])
+# Measured off the event loop by the /metrics handler
+registry.callback("index_cache_bytes", "Size of the on-disk index cache", lambda: index_store.cached_total_bytes)
+registry.callback("shared_index_chunks", "Chunks in the cross-video index", lambda: shared_index.stats()["chunks"])
+registry.callback("conversation_sessions", "Conversation sessions held in memory", lambda: conversations.stats()["sessions"])
+registry.callback("ingest_jobs_active", "Ingestion jobs queued or running", lambda: ingest_jobs.stats()["active"])
+registry.callback("download_jobs_active", "Downloads queued or running", lambda: download_jobs.stats()["active"])
+registry.callback("models_ready", "Whether the models have finished loading", lambda: int(models.ready))
+registry.callback(
+    "video_evictions_total", "Videos evicted from memory by reason",
+    lambda: processed_videos.stats()["evictions"], kind="counter", labelname="reason"
+)
+registry.callback(
+    "admission_active", "Requests holding an admission slot by class",
+    lambda: {"chat": chat_gate.active, "ingestion": ingest_gate.active}, labelname="class"
+)
+registry.callback(
+    "admission_queued", "Requests waiting for an admission slot by class",
+    lambda: {"chat": chat_gate.stats()["queued"], "ingestion": ingest_gate.stats()["queued"]}, labelname="class"
+)
+registry.callback(
+    "admission_rejected_total", "Requests rejected with a 503 because the queue was full or too slow",
+    lambda: {
+        "chat": chat_gate.rejected + chat_gate.timed_out,
+        "ingestion": ingest_gate.rejected + ingest_gate.timed_out
+    }, kind="counter", labelname="class"
+)
+registry.callback(
+    "rate_limited_total", "Requests rejected with a 429 by the per-client rate limits",
+    lambda: {"chat": chat_rate.limited, "ingestion": ingest_rate.limited}, kind="counter", labelname="class"
+)
+registry.callback("answer_cache_hits_total", "Answer cache hits", lambda: answer_cache.hits, kind="counter")
+registry.callback("answer_cache_misses_total", "Answer cache misses", lambda: answer_cache.misses, kind="counter")
+registry.callback("answer_cache_evictions_total", "Answers evicted from the answer cache", lambda: answer_cache.evictions, kind="counter")
+registry.callback(
+    "embedding_cache_hits_total", "Embedding cache hits",
+    lambda: models.embeddings.hits if models.embeddings is not None else None, kind="counter"
+)
+registry.callback(
+    "embedding_cache_misses_total", "Embedding cache misses",
+    lambda: models.embeddings.misses if models.embeddings is not None else None, kind="counter"
+)
+
+
+async def instrument_requests(request: Request, call_next):
+    """Count and time every HTTP request, optionally reporting stage timings in Server-Timing"""
+    timings = {}
+    token = request_timings.set(timings)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        record_error(e, "http")
+        raise
+    finally:
+        request_timings.reset(token)
+    elapsed = time.perf_counter() - started
+
+    # Label by route template, not the raw path, so IDs don't explode the label set
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    http_requests.inc(method=request.method, route=path, status=response.status_code)
+    http_duration.labels(request.method, path).observe(elapsed)
+
+    if SERVER_TIMING_ENABLED or request.headers.get(DEBUG_TIMING_HEADER) == "1":
+        # Streamed responses only include the stages finished before the first byte
+        entries = [f"{stage};dur={ms:.1f}" for stage, ms in timings.items()]
+        entries.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    # Walking the index cache directory is disk I/O; it is cached between scrapes
+    await asyncio.to_thread(index_store.total_bytes)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
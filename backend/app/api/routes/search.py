@@ -0,0 +1,116 @@
+from fastapi import APIRouter, HTTPException
+from app.schemas.video import SearchRequest, SearchResponse, MultiChatRequest, MultiChatResponse
+from app.services.rag import embed_query, format_docs, doc_sources, get_answer_chain
+from app.services.models import models
+from app.services.shared_index import shared_index
+from app.services.index_store import index_store
+from app.config import SHARED_INDEX_ENABLED, RETRIEVAL_K
+from datetime import datetime
+import logging
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+search_router = APIRouter()
+
+
+# Keeps the startup population task referenced while it runs
+_populate_task = None
+
+
+async def populate_shared_index():
+    """Start loading every cached per-video index into the shared index.
+
+    Runs as a background task so the server starts serving immediately;
+    it waits for the embedding model, which FAISS needs to load indexes.
+    """
+    global _populate_task
+    if SHARED_INDEX_ENABLED:
+        _populate_task = asyncio.create_task(_populate_from_cache())
+
+
+async def _populate_from_cache():
+    embeddings = await models.get_embeddings()
+    if embeddings is None:
+        return
+    count = 0
+    for video_id in await asyncio.to_thread(index_store.video_ids):
+        if shared_index.has_video(video_id):
+            continue
+        # A restart is not a use; keep the cache's eviction order as it was
+        cached = await asyncio.to_thread(index_store.load, video_id, embeddings, False)
+        if cached is not None:
+            await asyncio.to_thread(shared_index.add_video, video_id, cached["vector_store"])
+            count += 1
+    logger.info(f"Loaded {count} cached videos into the shared index")
+
+
+def require_shared_index(query: str):
+    if not SHARED_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Shared index is disabled. Set SHARED_INDEX_ENABLED=true")
+    if not query:
+        raise HTTPException(status_code=400, detail="Query is required")
+
+
+@search_router.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest):
+    """Search transcript chunks across all (or the given) processed videos"""
+    query = request.query.strip()
+    require_shared_index(query)
+    
+    try:
+        query_vector = await embed_query(query)
+        results = await asyncio.to_thread(shared_index.search, query_vector, request.k, request.video_ids)
+        
+        return SearchResponse(
+            results=[
+                {**doc_sources([result["document"]])[0], "video_id": result["video_id"], "score": result["score"]}
+                for result in results
+            ],
+            query=query,
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching shared index: {e}")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+
+@search_router.post("/chat/multi", response_model=MultiChatResponse)
+async def chat_multi(request: MultiChatRequest):
+    """Chat across several videos (or every processed video) at once"""
+    query = request.query.strip()
+    require_shared_index(query)
+    answer_chain = await get_answer_chain()
+    
+    logger.info(f"Multi-video chat request over {request.video_ids or 'all videos'}: {query}")
+    
+    try:
+        query_vector = await embed_query(query)
+        results = await asyncio.to_thread(shared_index.search, query_vector, RETRIEVAL_K, request.video_ids)
+        
+        # Label each excerpt with its video so the model can tell sources apart
+        transcript = "\n\n".join(
+            f"(Video {result['video_id']}) {format_docs([result['document']])}"
+            for result in results
+        )
+        response = await answer_chain.ainvoke({"transcript": transcript, "question": query})
+        
+        return MultiChatResponse(
+            response=response,
+            query=query,
+            video_ids=request.video_ids,
+            sources=[
+                {**doc_sources([result["document"]])[0], "video_id": result["video_id"]}
+                for result in results
+            ],
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating multi-video response: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
@@ -1,20 +1,225 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.video import VideoRequest, ChatRequest, ProcessResponse, ChatResponse
-from app.services.rag import extract_transcript, create_vector_store, format_docs, model, prompt
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda, RunnableParallel
-from langchain_core.output_parsers import StrOutputParser
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from app.schemas.video import VideoRequest, ChatRequest, ProcessResponse, ChatResponse, JobStatusResponse
+from app.services.rag import ingest_video, build_lexical_index, embed_query, retrieve_context, format_docs, doc_sources, get_answer_chain
+from app.services.models import models
+from app.services.index_store import index_store
+from app.services.registry import processed_videos
+from app.services.singleflight import SingleFlight
+from app.services.jobs import ingest_jobs
+from app.services.answer_cache import answer_cache
+from app.services.shared_index import shared_index
+from app.services.index_types import index_type_of
+from app.services.video_state import video_states
+from app.services.conversation import conversations, assemble_context, estimate_tokens
+from app.services.metrics import record_error, record_chat_timings
+from app.services.admission import (
+    chat_gate, ingest_gate, limit_chat_rate, limit_ingest_rate, INDEXED_PRIORITY, DEFAULT_PRIORITY
+)
+from app.config import SHARED_INDEX_ENABLED, WORKERS
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable
 import logging
+import asyncio
+import json
+import time
 
 logger = logging.getLogger(__name__)
 
 video_router = APIRouter()
 
-# Global storage for processed videos (in production, use a proper database)
-processed_videos: Dict[str, Dict[str, Any]] = {}
+# In-progress video builds, keyed by video_id
+video_builds = SingleFlight()
 
-@video_router.post("/process_video", response_model=ProcessResponse)
+# Builds still indexing after their video became chat-ready, keyed by video_id
+background_builds: Dict[str, asyncio.Task] = {}
+
+# How often a worker checks whether another worker has finished building a video
+BUILD_POLL_SECONDS = 1.0
+
+
+async def build_video_to_completion(video_id: str, progress: Optional[Callable[..., None]] = None) -> str:
+    """Build a video and wait until its whole transcript is indexed"""
+    status = await video_builds.do(video_id, lambda: build_video(video_id, progress, background=True))
+    task = background_builds.get(video_id)
+    if status == "partial" and task is not None:
+        status = await asyncio.shield(task)
+    return status
+
+
+def register_video(video_id: str, vector_store, lexical, transcript_length: int, processed_at: str, status: str = "ready") -> Dict[str, Any]:
+    """Keep a video's vector store and BM25 index in memory"""
+    return processed_videos.put(video_id, {
+        "vector_store": vector_store,
+        "lexical": lexical,
+        "status": status,
+        "transcript_length": transcript_length,
+        "processed_at": processed_at
+    })
+
+
+async def load_cached_video(video_id: str) -> Optional[Dict[str, Any]]:
+    """Lazily restore a processed video from the on-disk index cache"""
+    embeddings = await models.get_embeddings()
+    if embeddings is None:
+        return None
+    cached = await asyncio.to_thread(index_store.load, video_id, embeddings)
+    if cached is None:
+        return None
+    meta = cached["meta"]
+    # Indexes cached before BM25 was added get their lexical index rebuilt
+    lexical = cached["lexical"] or build_lexical_index(cached["vector_store"])
+    if SHARED_INDEX_ENABLED and not shared_index.has_video(video_id):
+        await asyncio.to_thread(shared_index.add_video, video_id, cached["vector_store"])
+    return register_video(
+        video_id,
+        cached["vector_store"],
+        lexical,
+        meta.get("transcript_length", 0),
+        meta.get("processed_at", datetime.now().isoformat())
+    )
+
+
+async def run_uninterrupted(func: Callable, *args) -> Any:
+    """Run func in a worker thread; when cancelled, wait for the thread before re-raising.
+
+    Cancelling ``asyncio.to_thread`` doesn't stop the thread, so without
+    this a write could land after the caller has cleaned up.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait({future})
+        raise
+
+
+async def finish_build(video_id: str, progress: Optional[Callable[..., None]], on_ready: Callable) -> str:
+    """Run the whole ingestion pipeline, then register and persist the complete index"""
+    try:
+        # Fetch the transcript, chunk it and embed the chunks batch by batch
+        result = await ingest_video(video_id, progress, on_ready)
+    except (Exception, asyncio.CancelledError):
+        # Don't leave a partial index behind that will never be completed
+        entry = processed_videos.get(video_id)
+        if entry is not None and entry["status"] == "partial":
+            processed_videos.pop(video_id)
+        # Let another worker (or a retry) build the video
+        await asyncio.to_thread(video_states.release, video_id)
+        raise
+    vector_store = result["vector_store"]
+    lexical = result["lexical"]
+    transcript_length = result["transcript_length"]
+    
+    # Store processed video data
+    processed_at = datetime.now().isoformat()
+    register_video(video_id, vector_store, lexical, transcript_length, processed_at)
+    # Answers given from a partial index may have missed later chunks
+    answer_cache.invalidate(video_id)
+    
+    if SHARED_INDEX_ENABLED:
+        await run_uninterrupted(shared_index.add_video, video_id, vector_store)
+    
+    # Persist the index so restarts don't have to re-embed the transcript
+    if progress is not None:
+        progress(stage="saving_index")
+    await run_uninterrupted(index_store.save, video_id, vector_store, {
+        "video_id": video_id,
+        "transcript_length": transcript_length,
+        "index_type": index_type_of(vector_store.index),
+        "processed_at": processed_at
+    }, lexical)
+    # Other workers waiting on this build can now load the saved index
+    await asyncio.to_thread(video_states.mark_ready, video_id)
+    
+    logger.info(f"Successfully processed video {video_id}")
+    return "processed"
+
+
+async def build_video(video_id: str, progress: Optional[Callable[..., None]] = None, background: bool = False) -> str:
+    """Fetch, embed and register a video, returning its processing status.
+
+    Returns "partial" as soon as the first batches are indexed and the video
+    can be chatted with; the rest of the transcript keeps being indexed in a
+    background task tracked in ``background_builds``.
+
+    Each build holds an ingestion slot until it has been fully indexed.
+    Requests are rejected with a 503 when the ingestion queue is full;
+    ``background`` builds were admitted when their job was submitted and
+    always wait.
+    """
+    # A chat-ready video may still be indexing after its partial entry was evicted
+    if video_id in background_builds:
+        return "partial"
+    
+    # Check if video is already processed
+    if video_id in processed_videos or await load_cached_video(video_id) is not None:
+        logger.info(f"Video {video_id} already processed")
+        return "already_processed"
+    
+    # Only one worker process builds a video; the others wait for its saved index
+    if not await asyncio.to_thread(video_states.claim_build, video_id):
+        logger.info(f"Video {video_id} is being processed by another worker; waiting for it")
+        if progress is not None:
+            progress(stage="waiting_for_other_worker")
+        while True:
+            await asyncio.sleep(BUILD_POLL_SECONDS)
+            # Check for a finished build before claiming, or a ready video would be rebuilt
+            if await asyncio.to_thread(video_states.status, video_id) == "ready" and await load_cached_video(video_id) is not None:
+                return "processed"
+            if await asyncio.to_thread(video_states.claim_build, video_id):
+                break
+    
+    try:
+        if progress is not None:
+            progress(stage="waiting_for_slot")
+        admitted_at = await ingest_gate.acquire(bounded=not background)
+    except (Exception, asyncio.CancelledError):
+        await asyncio.to_thread(video_states.release, video_id)
+        raise
+    
+    ready = asyncio.Event()
+    
+    def on_ready(vector_store, lexical, chunks: int):
+        register_video(video_id, vector_store, lexical, chunks, datetime.now().isoformat(), status="partial")
+        if progress is not None:
+            progress(chat_ready=1)
+        logger.info(f"Video {video_id} is ready for chat after {chunks} chunks; indexing the rest")
+        ready.set()
+    
+    task = asyncio.create_task(finish_build(video_id, progress, on_ready))
+    heartbeat = asyncio.create_task(keep_build_claim(video_id))
+    task.add_done_callback(lambda t: heartbeat.cancel())
+    background_builds[video_id] = task
+    task.add_done_callback(lambda t: finish_background_build(video_id, t))
+    # Released from a callback so a build cancelled before it starts still frees its slot
+    task.add_done_callback(lambda t: ingest_gate.release(admitted_at))
+    
+    ready_wait = asyncio.create_task(ready.wait())
+    await asyncio.wait({task, ready_wait}, return_when=asyncio.FIRST_COMPLETED)
+    if task.done():
+        ready_wait.cancel()
+        return task.result()
+    return "partial"
+
+
+async def keep_build_claim(video_id: str) -> None:
+    """Renew this worker's build lease until cancelled, so builds longer than the lease aren't taken over"""
+    while True:
+        await asyncio.sleep(max(1, video_states.lease_seconds / 3))
+        if not await asyncio.to_thread(video_states.renew_build, video_id):
+            logger.warning(f"Lost the build claim on video {video_id}")
+            return
+
+
+def finish_background_build(video_id: str, task: asyncio.Task) -> None:
+    if background_builds.get(video_id) is task:
+        del background_builds[video_id]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background indexing of video {video_id} failed: {task.exception()}")
+
+
+@video_router.post("/process_video", response_model=ProcessResponse, dependencies=[Depends(limit_ingest_rate)])
 async def process_video(request: VideoRequest):
     """Process a YouTube video for RAG chat"""
     video_id = request.video_id.strip()
@@ -25,52 +230,42 @@ async def process_video(request: VideoRequest):
     logger.info(f"Processing video: {video_id}")
     
     try:
-        # Check if video is already processed
-        if video_id in processed_videos:
-            logger.info(f"Video {video_id} already processed")
+        # Background mode: hand the build to the job queue and return immediately
+        if request.background and video_id not in processed_videos:
+            # Bound the job backlog here, since queued jobs wait for a slot without limit
+            if ingest_jobs.active_job(video_id) is None:
+                ingest_gate.check_backlog(ingest_jobs.stats()["active"])
+            job = ingest_jobs.submit(
+                video_id,
+                lambda job: build_video_to_completion(video_id, job.update)
+            )
             return ProcessResponse(
-                message=f"Video {video_id} was already processed and is ready for chat",
+                message=f"Video {video_id} queued for processing",
                 video_id=video_id,
-                status="already_processed",
-                timestamp=datetime.now().isoformat()
+                status=job.status,
+                timestamp=datetime.now().isoformat(),
+                job_id=job.id
             )
         
-        # Extract transcript
-        transcript = extract_transcript(video_id)
+        # Concurrent requests for the same video share one in-progress build
+        await sync_video_state(video_id)
+        entry = processed_videos.get(video_id)
+        if entry is not None:
+            status = "partial" if entry["status"] == "partial" else "already_processed"
+        else:
+            status = await video_builds.do(video_id, lambda: build_video(video_id))
         
-        # Create vector store
-        vector_store = create_vector_store(transcript, video_id)
-        
-        # Create retriever
-        retriever = vector_store.as_retriever(
-            search_type="similarity", 
-            search_kwargs={"k": 4}
-        )
-        
-        # Create RAG chain
-        parallel_chain = RunnableParallel({
-            "transcript": retriever | RunnableLambda(format_docs),
-            "question": RunnablePassthrough()
-        })
-        
-        parser = StrOutputParser()
-        main_chain = parallel_chain | prompt | model | parser
-        
-        # Store processed video data
-        processed_videos[video_id] = {
-            "vector_store": vector_store,
-            "retriever": retriever,
-            "chain": main_chain,
-            "transcript_length": len(transcript),
-            "processed_at": datetime.now().isoformat()
-        }
-        
-        logger.info(f"Successfully processed video {video_id}")
+        if status == "already_processed":
+            message = f"Video {video_id} was already processed and is ready for chat"
+        elif status == "partial":
+            message = f"Video {video_id} is ready for chat; the rest of the transcript is still being indexed"
+        else:
+            message = f"Video {video_id} processed successfully and is ready for chat"
         
         return ProcessResponse(
-            message=f"Video {video_id} processed successfully and is ready for chat",
+            message=message,
             video_id=video_id,
-            status="processed",
+            status=status,
             timestamp=datetime.now().isoformat()
         )
         
@@ -80,52 +275,269 @@ async def process_video(request: VideoRequest):
         logger.error(f"Unexpected error processing video {video_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-@video_router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """Chat with processed video content"""
-    video_id = request.video_id.strip()
-    query = request.query.strip()
-    
+@video_router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Report the stage and progress of a background processing job"""
+    job = await asyncio.to_thread(ingest_jobs.snapshot, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(**job)
+
+async def sync_video_state(video_id: str) -> Optional[str]:
+    """Drop this worker's copy of a video another worker deleted, returning its shared state"""
+    if WORKERS == 1:
+        return None
+    state = await asyncio.to_thread(video_states.status, video_id)
+    if state != "deleted":
+        return state
+    in_memory = processed_videos.pop(video_id) is not None
+    shared = shared_index.has_video(video_id)
+    if shared:
+        await asyncio.to_thread(shared_index.remove_video, video_id)
+    if in_memory or shared:
+        answer_cache.invalidate(video_id)
+        logger.info(f"Dropped video {video_id} deleted by another worker")
+    return state
+
+async def resolve_chat_video(video_id: str, query: str) -> Dict[str, Any]:
+    """Validate a chat request and return the processed video it targets"""
     if not video_id:
         raise HTTPException(status_code=400, detail="Video ID is required")
     
     if not query:
         raise HTTPException(status_code=400, detail="Query is required")
     
-    logger.info(f"Chat request for video {video_id}: {query}")
+    # Check if video is processed, falling back to the on-disk cache
+    state = await sync_video_state(video_id)
+    video_data = processed_videos.get(video_id) or await load_cached_video(video_id)
+    if video_data is None and SHARED_INDEX_ENABLED and shared_index.has_video(video_id):
+        video_data = {"shared": True, "video_id": video_id, "status": "ready"}
+    if video_data is None and state == "building":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Video {video_id} is still being processed. Please try again shortly."
+        )
+    if video_data is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Video {video_id} has not been processed. Please process it first."
+        )
+    
+    # Fails fast with a 500 when the language model could not be loaded
+    await get_answer_chain()
+    
+    return video_data
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def chat_priority(video_id: str) -> int:
+    """Chats on fully indexed videos held in memory go ahead of the rest"""
+    entry = processed_videos.get(video_id)
+    return INDEXED_PRIORITY if entry is not None and entry["status"] == "ready" else DEFAULT_PRIORITY
+
+@video_router.post("/chat", response_model=ChatResponse, dependencies=[Depends(limit_chat_rate)])
+async def chat(request: ChatRequest):
+    """Chat with processed video content"""
+    async with chat_gate.admit(chat_priority(request.video_id.strip())):
+        return await answer_chat(request)
+
+async def answer_chat(request: ChatRequest) -> ChatResponse:
+    video_id = request.video_id.strip()
+    query = request.query.strip()
+    request_started = time.perf_counter()
     
     try:
-        # Check if video is processed
-        if video_id not in processed_videos:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Video {video_id} has not been processed. Please process it first."
-            )
-        
-        # Get the RAG chain for this video
-        video_data = processed_videos[video_id]
-        chain = video_data["chain"]
+        video_data = await resolve_chat_video(video_id, query)
+        logger.info(f"Chat request for video {video_id}: {query}")
+        turns = conversations.turns(video_id, request.session_id)
+        timings: Dict[str, float] = {}
         
-        if model is None:
-            raise HTTPException(status_code=500, detail="Language model not available")
+        # Answer near-duplicate questions from the cache; follow-ups depend
+        # on the conversation so they always go to the model
+        started = time.perf_counter()
+        query_vector = await embed_query(query)
+        timings["embed_ms"] = elapsed_ms(started)
+        cached = answer_cache.lookup(video_id, query_vector) if not turns else None
+        if cached is not None:
+            logger.info(f"Answer cache hit for video {video_id}")
+            conversations.add_turn(video_id, request.session_id, query, cached["response"], [])
+            return ChatResponse(
+                response=cached["response"],
+                video_id=video_id,
+                query=query,
+                timestamp=datetime.now().isoformat(),
+                cached=True,
+                sources=cached["sources"],
+                session_id=request.session_id
+            )
         
-        # Generate response
-        response = chain.invoke(query)
+        # Retrieve relevant chunks, fit them and the history into the prompt budget, then generate
+        docs = await retrieve_context(video_data, query, query_vector, request.retrieval_mode, timings)
+        started = time.perf_counter()
+        history, context_docs = assemble_context(turns, docs)
+        transcript = format_docs(context_docs)
+        timings["prompt_ms"] = elapsed_ms(started)
+        timings["chunks"] = len(context_docs)
+        timings["context_tokens"] = estimate_tokens(transcript) + estimate_tokens(history)
+        answer_chain = await get_answer_chain()
+        # Streamed internally so time to first token can be measured
+        started = time.perf_counter()
+        tokens = []
+        async for token in answer_chain.astream({
+            "transcript": transcript,
+            "history": history,
+            "question": query
+        }):
+            if not tokens:
+                timings["ttft_ms"] = elapsed_ms(started)
+            tokens.append(token)
+        response = "".join(tokens)
+        timings["llm_ms"] = elapsed_ms(started)
+        timings["total_ms"] = elapsed_ms(request_started)
+        record_chat_timings(timings)
+        sources = doc_sources(context_docs)
+        if not turns:
+            answer_cache.store(video_id, query_vector, {"response": response, "sources": sources})
+        conversations.add_turn(video_id, request.session_id, query, response, docs)
         
-        logger.info(f"Generated response for video {video_id}")
+        logger.info(f"Generated response for video {video_id} ({timings})")
         
         return ChatResponse(
             response=response,
             video_id=video_id,
             query=query,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            sources=sources,
+            session_id=request.session_id,
+            timings=timings
         )
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating response for video {video_id}: {e}")
+        record_error(e, "chat")
         raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@video_router.post("/chat/stream", dependencies=[Depends(limit_chat_rate)])
+async def chat_stream(request: ChatRequest):
+    """Chat with processed video content, streaming tokens as server-sent events.
+
+    Emits a ``retrieval`` event with the source chunks and their time ranges
+    once they are found, a ``token``
+    event for every piece of the answer, and a final ``done`` (or ``error``) event.
+    """
+    video_id = request.video_id.strip()
+    query = request.query.strip()
+    request_started = time.perf_counter()
+    
+    # Validation errors are returned as normal HTTP errors before the stream starts
+    video_data = await resolve_chat_video(video_id, query)
+    logger.info(f"Streaming chat request for video {video_id}: {query}")
+    # Reject before the stream starts when the queue is full; the slot itself
+    # is taken inside the stream so it is only held while the answer is generated
+    chat_gate.check()
+    priority = chat_priority(video_id)
+    
+    async def event_stream():
+        try:
+            admitted_at = await chat_gate.acquire(priority)
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+            return
+        try:
+            async for event in answer_events():
+                yield event
+        finally:
+            chat_gate.release(admitted_at)
+    
+    async def answer_events():
+        try:
+            started = time.perf_counter()
+            turns = conversations.turns(video_id, request.session_id)
+            timings: Dict[str, float] = {}
+            query_vector = await embed_query(query)
+            timings["embed_ms"] = elapsed_ms(started)
+            
+            # A cached answer is sent as a single token
+            cached = answer_cache.lookup(video_id, query_vector) if not turns else None
+            if cached is not None:
+                logger.info(f"Answer cache hit for video {video_id}")
+                conversations.add_turn(video_id, request.session_id, query, cached["response"], [])
+                yield sse_event("retrieval", {
+                    "chunks": len(cached["sources"]),
+                    "sources": cached["sources"],
+                    "cached": True
+                })
+                yield sse_event("token", {"token": cached["response"]})
+                yield sse_event("done", {
+                    "response": cached["response"],
+                    "video_id": video_id,
+                    "query": query,
+                    "timestamp": datetime.now().isoformat(),
+                    "cached": True
+                })
+                return
+            
+            docs = await retrieve_context(video_data, query, query_vector, request.retrieval_mode, timings)
+            prompt_started = time.perf_counter()
+            history, context_docs = assemble_context(turns, docs)
+            transcript = format_docs(context_docs)
+            timings["prompt_ms"] = elapsed_ms(prompt_started)
+            timings["chunks"] = len(context_docs)
+            timings["context_tokens"] = estimate_tokens(transcript) + estimate_tokens(history)
+            sources = doc_sources(context_docs)
+            yield sse_event("retrieval", {
+                "chunks": len(context_docs),
+                "sources": sources,
+                "retrieval_ms": elapsed_ms(started),
+                "timings": timings
+            })
+            
+            tokens = []
+            answer_chain = await get_answer_chain()
+            generation_started = time.perf_counter()
+            async for token in answer_chain.astream({
+                "transcript": transcript,
+                "history": history,
+                "question": query
+            }):
+                if not tokens:
+                    timings["ttft_ms"] = elapsed_ms(generation_started)
+                tokens.append(token)
+                yield sse_event("token", {"token": token})
+            
+            response = "".join(tokens)
+            timings["llm_ms"] = elapsed_ms(generation_started)
+            timings["total_ms"] = elapsed_ms(request_started)
+            record_chat_timings(timings)
+            if not turns:
+                answer_cache.store(video_id, query_vector, {"response": response, "sources": sources})
+            conversations.add_turn(video_id, request.session_id, query, response, docs)
+            
+            logger.info(f"Streamed response for video {video_id}")
+            yield sse_event("done", {
+                "response": response,
+                "video_id": video_id,
+                "query": query,
+                "timestamp": datetime.now().isoformat(),
+                "timings": timings
+            })
+        except Exception as e:
+            logger.error(f"Error streaming response for video {video_id}: {e}")
+            record_error(e, "chat_stream")
+            yield sse_event("error", {"detail": f"Failed to generate response: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
     
 
 @video_router.get("/videos")
@@ -136,22 +548,40 @@ async def list_processed_videos():
         videos.append({
             "video_id": video_id,
             "processed_at": data["processed_at"],
-            "transcript_length": data["transcript_length"]
+            "status": data["status"],
+            "transcript_length": data["transcript_length"],
+            "size_bytes": data["size_bytes"]
         })
     
     return {
         "processed_videos": videos,
         "count": len(videos),
+        "memory": processed_videos.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 @video_router.delete("/videos/{video_id}")
 async def delete_processed_video(video_id: str):
-    """Delete a processed video from memory"""
-    if video_id not in processed_videos:
+    """Delete a processed video from memory and the on-disk cache"""
+    task = background_builds.get(video_id)
+    if task is not None:
+        task.cancel()
+        # Let an index write already in a worker thread finish, so it can't land after the delete
+        await asyncio.wait({task})
+    try:
+        on_disk = await asyncio.to_thread(index_store.delete, video_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    in_memory = processed_videos.pop(video_id) is not None
+    # Tell other workers to drop their copies
+    await asyncio.to_thread(video_states.mark_deleted, video_id)
+    answer_cache.invalidate(video_id)
+    conversations.invalidate(video_id)
+    shared = shared_index.has_video(video_id)
+    await asyncio.to_thread(shared_index.remove_video, video_id)
+    if not in_memory and not on_disk and not shared:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    del processed_videos[video_id]
     logger.info(f"Deleted processed video: {video_id}")
     
     return {
@@ -0,0 +1,133 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# Local cache directory for persisted indexes
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+# On-disk FAISS index cache
+INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", os.path.join(CACHE_DIR, "indexes"))
+INDEX_CACHE_MAX_BYTES = _env_int("INDEX_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+
+# In-memory registry of processed videos
+REGISTRY_MAX_BYTES = _env_int("REGISTRY_MAX_BYTES", 1024 ** 3)
+REGISTRY_IDLE_TTL_SECONDS = _env_int("REGISTRY_IDLE_TTL_SECONDS", 3600)
+
+# Dedicated thread pool for CPU-bound embedding work
+EMBEDDING_WORKERS = _env_int("EMBEDDING_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+
+# Background ingestion jobs
+INGEST_JOB_WORKERS = _env_int("INGEST_JOB_WORKERS", 2)
+INGEST_JOB_HISTORY = _env_int("INGEST_JOB_HISTORY", 500)
+EMBEDDING_BATCH_SIZE = _env_int("EMBEDDING_BATCH_SIZE", 32)
+
+# Retrieval
+RETRIEVAL_K = _env_int("RETRIEVAL_K", 4)
+
+# Semantic answer cache
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_PER_VIDEO = _env_int("ANSWER_CACHE_MAX_PER_VIDEO", 100)
+ANSWER_CACHE_MAX_VIDEOS = _env_int("ANSWER_CACHE_MAX_VIDEOS", 1000)
+
+# Embedding model and the content-addressed chunk embedding cache
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite3"))
+# Inference backend: "torch", "onnx" (ONNX Runtime, fp32) or "onnx-int8" (dynamically quantized)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Quantized ONNX file in the model repo; pick the variant matching the CPU (avx2, avx512_vnni, arm64)
+EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+
+# Micro-batching of embedding requests across concurrent callers
+EMBEDDING_MAX_BATCH_SIZE = _env_int("EMBEDDING_MAX_BATCH_SIZE", 64)
+EMBEDDING_MAX_WAIT_MS = _env_int("EMBEDDING_MAX_WAIT_MS", 5)
+
+# Local store of raw transcript segments
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join(CACHE_DIR, "transcripts"))
+TRANSCRIPT_CACHE_TTL_SECONDS = _env_int("TRANSCRIPT_CACHE_TTL_SECONDS", 7 * 24 * 3600)
+
+# Videos become chat-ready after this many embedding batches; the rest is indexed in the background
+PARTIAL_READY_BATCHES = _env_int("PARTIAL_READY_BATCHES", 4)
+
+# Default retrieval mode: "vector", "lexical" or "hybrid" (BM25 + vector fused by reciprocal rank)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Optional shared HNSW index over the chunks of every processed video
+SHARED_INDEX_ENABLED = os.getenv("SHARED_INDEX_ENABLED", "false").lower() == "true"
+SHARED_INDEX_HNSW_M = _env_int("SHARED_INDEX_HNSW_M", 32)
+SHARED_INDEX_EF_SEARCH = _env_int("SHARED_INDEX_EF_SEARCH", 128)
+
+# FAISS index type per video: "flat", "sq8" (int8 scalar quantized), "pq" or "auto" (chosen by chunk count)
+INDEX_TYPE = os.getenv("INDEX_TYPE", "auto")
+INDEX_SQ8_MIN_CHUNKS = _env_int("INDEX_SQ8_MIN_CHUNKS", 2000)
+INDEX_PQ_MIN_CHUNKS = _env_int("INDEX_PQ_MIN_CHUNKS", 20000)
+
+# Load the embedding model and LLM in the background at startup instead of on first use
+MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"
+
+# Multi-worker serving: uvicorn worker processes, the shared SQLite record of
+# ready/building videos, and how long a build claim holds before it is considered abandoned
+WORKERS = _env_int("WORKERS", 1)
+VIDEO_STATE_PATH = os.getenv("VIDEO_STATE_PATH", os.path.join(CACHE_DIR, "videos.sqlite3"))
+BUILD_LEASE_SECONDS = _env_int("BUILD_LEASE_SECONDS", 1800)
+# Memory-map cached indexes read-only so workers share one copy through the page cache
+INDEX_MMAP = os.getenv("INDEX_MMAP", "true").lower() == "true"
+
+# Conversation memory and the token budget for history plus transcript chunks in each prompt
+CHAT_CONTEXT_TOKEN_BUDGET = _env_int("CHAT_CONTEXT_TOKEN_BUDGET", 3000)
+CHAT_HISTORY_TOKEN_BUDGET = _env_int("CHAT_HISTORY_TOKEN_BUDGET", 1000)
+CONVERSATION_MAX_TURNS = _env_int("CONVERSATION_MAX_TURNS", 20)
+CONVERSATION_MAX_SESSIONS = _env_int("CONVERSATION_MAX_SESSIONS", 1000)
+CONVERSATION_IDLE_TTL_SECONDS = _env_int("CONVERSATION_IDLE_TTL_SECONDS", 3600)
+
+# Optional cross-encoder reranking: over-fetch candidates, rescore them, and keep an
+# adaptive number of chunks by score cutoff, count and token budget
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = _env_int("RERANK_CANDIDATES", 20)
+RERANK_MIN_SCORE = float(os.getenv("RERANK_MIN_SCORE", "0.0"))
+RERANK_MIN_K = _env_int("RERANK_MIN_K", 1)
+RERANK_MAX_K = _env_int("RERANK_MAX_K", 8)
+RERANK_TOKEN_BUDGET = _env_int("RERANK_TOKEN_BUDGET", 1500)
+
+# Video/audio downloads: concurrent downloads, fragments fetched in parallel per
+# download, and the minimum interval between progress updates sent to clients
+DOWNLOAD_WORKERS = _env_int("DOWNLOAD_WORKERS", 2)
+DOWNLOAD_FRAGMENT_CONCURRENCY = _env_int("DOWNLOAD_FRAGMENT_CONCURRENCY", 4)
+DOWNLOAD_PROGRESS_INTERVAL_MS = _env_int("DOWNLOAD_PROGRESS_INTERVAL_MS", 250)
+
+# Local speech-to-text when a video has no captions (needs faster-whisper)
+STT_FALLBACK_ENABLED = os.getenv("STT_FALLBACK_ENABLED", "false").lower() == "true"
+STT_MODEL_NAME = os.getenv("STT_MODEL_NAME", "base")
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+STT_WORKERS = _env_int("STT_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+STT_CHUNK_SECONDS = _env_int("STT_CHUNK_SECONDS", 300)
+STT_AUDIO_DIR = os.getenv("STT_AUDIO_DIR", os.path.join(CACHE_DIR, "audio"))
+
+# Adds a Server-Timing header with per-stage durations to every response;
+# without it, only requests sending "X-Debug-Timing: 1" get the header
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+# Admission control: concurrency limits and bounded wait queues per request class
+CHAT_MAX_CONCURRENCY = _env_int("CHAT_MAX_CONCURRENCY", 32)
+CHAT_QUEUE_SIZE = _env_int("CHAT_QUEUE_SIZE", 64)
+CHAT_QUEUE_TIMEOUT_SECONDS = _env_int("CHAT_QUEUE_TIMEOUT_SECONDS", 10)
+INGEST_MAX_CONCURRENCY = _env_int("INGEST_MAX_CONCURRENCY", 2)
+INGEST_QUEUE_SIZE = _env_int("INGEST_QUEUE_SIZE", 8)
+INGEST_QUEUE_TIMEOUT_SECONDS = _env_int("INGEST_QUEUE_TIMEOUT_SECONDS", 120)
+
+# Per-client rate limits (token buckets keyed by X-API-Key or IP); 0 disables
+CHAT_RATE_PER_MINUTE = _env_int("CHAT_RATE_PER_MINUTE", 60)
+CHAT_RATE_BURST = _env_int("CHAT_RATE_BURST", 20)
+INGEST_RATE_PER_MINUTE = _env_int("INGEST_RATE_PER_MINUTE", 10)
+INGEST_RATE_BURST = _env_int("INGEST_RATE_BURST", 5)
+RATE_LIMIT_MAX_CLIENTS = _env_int("RATE_LIMIT_MAX_CLIENTS", 10000)
+# Comma-separated API keys that get their own bucket; any other key is limited by IP
+RATE_LIMIT_API_KEYS = frozenset(key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 
 
 # Pydantic models for request/response
@@ -15,23 +15,74 @@ class DownloadResponse(BaseModel):
     download_type: str
     error: Optional[str] = None
     timestamp: str
+    job_id: Optional[str] = None
+    stage: Optional[str] = None
+    progress: Dict[str, float] = {}  # downloaded_bytes, total_bytes, percent, speed, eta
 
 
 class VideoRequest(BaseModel):
     video_id: str
+    background: bool = False  # return a job id immediately instead of waiting
 
 class ChatRequest(BaseModel):
     video_id: str
     query: str
+    retrieval_mode: Optional[Literal["vector", "lexical", "hybrid"]] = None  # defaults to RETRIEVAL_MODE
+    session_id: Optional[str] = None  # keeps conversation history across requests
 
 class ProcessResponse(BaseModel):
     message: str
     video_id: str
     status: str
     timestamp: str
+    job_id: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    video_id: str
+    status: str  # "queued", "running", "completed" or "failed"
+    stage: str
+    progress: Dict[str, int]
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+class SourceChunk(BaseModel):
+    text: str
+    video_id: Optional[str] = None  # set for cross-video results
+    start: Optional[float] = None  # seconds into the video
+    end: Optional[float] = None
 
 class ChatResponse(BaseModel):
     response: str
     video_id: str
     query: str
     timestamp: str
+    cached: bool = False
+    sources: List[SourceChunk] = []
+    session_id: Optional[str] = None
+    timings: Dict[str, float] = {}  # per-stage latency in ms, chunk count and context tokens
+
+class SearchRequest(BaseModel):
+    query: str
+    video_ids: Optional[List[str]] = None  # restrict to these videos; all videos when omitted
+    k: int = 5
+
+class SearchResult(SourceChunk):
+    score: float
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    query: str
+    timestamp: str
+
+class MultiChatRequest(BaseModel):
+    query: str
+    video_ids: Optional[List[str]] = None
+
+class MultiChatResponse(BaseModel):
+    response: str
+    query: str
+    video_ids: Optional[List[str]] = None
+    sources: List[SourceChunk] = []
+    timestamp: str
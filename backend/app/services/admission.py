@@ -0,0 +1,232 @@
+from fastapi import HTTPException, Request
+from app.services.metrics import observe_stage
+from app.config import (
+    CHAT_MAX_CONCURRENCY, CHAT_QUEUE_SIZE, CHAT_QUEUE_TIMEOUT_SECONDS,
+    INGEST_MAX_CONCURRENCY, INGEST_QUEUE_SIZE, INGEST_QUEUE_TIMEOUT_SECONDS,
+    CHAT_RATE_PER_MINUTE, CHAT_RATE_BURST, INGEST_RATE_PER_MINUTE, INGEST_RATE_BURST,
+    RATE_LIMIT_MAX_CLIENTS, RATE_LIMIT_API_KEYS
+)
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import itertools
+import hashlib
+import asyncio
+import logging
+import heapq
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Chats on fully indexed, resident videos are cheap and go ahead of everything else
+INDEXED_PRIORITY = 0
+DEFAULT_PRIORITY = 1
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded, prioritised wait queue.
+
+    Up to ``max_concurrency`` requests hold a slot at once. The rest wait,
+    lowest ``priority`` first, in a queue of at most ``max_queue`` entries
+    for up to ``queue_timeout`` seconds. A request that finds the queue full
+    or times out in it gets a 503 with a Retry-After estimate, instead of
+    every request slowing down together. Background jobs wait without a
+    bound and are not counted against ``max_queue``; their backlog is
+    bounded when they are submitted (``check_backlog``). Only used from the
+    event loop.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.queue_stage = f"{name.lower()}_queue_wait"
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        # Unbounded waiters among _waiters
+        self.background_waiting = 0
+        self._order = itertools.count()
+        # Moving average of how long a slot is held, for Retry-After
+        self._avg_hold_seconds = 1.0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _overloaded(self, reason: str, ahead: Optional[int] = None) -> HTTPException:
+        ahead = len(self._waiters) if ahead is None else ahead
+        retry_after = max(1, math.ceil(self._avg_hold_seconds * (ahead + 1) / self.max_concurrency))
+        return HTTPException(
+            status_code=503,
+            detail=f"{self.name} is at capacity ({reason}). Please retry in {retry_after}s.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    def check(self) -> None:
+        """Reject now if a request arriving at this moment would find the queue full"""
+        if self.active >= self.max_concurrency and len(self._waiters) - self.background_waiting >= self.max_queue:
+            self.rejected += 1
+            raise self._overloaded("queue full")
+
+    def check_backlog(self, pending: int) -> None:
+        """Reject a new background job when ``pending`` jobs are already queued or running"""
+        if pending >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise self._overloaded("job queue full", pending)
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY, bounded: bool = True) -> float:
+        """Wait for a slot, returning the time it was granted for ``release``.
+
+        ``bounded=False`` waits however long the queue is, for work that is
+        already queued elsewhere (like background jobs).
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            observe_stage(self.queue_stage, 0.0)
+            return time.monotonic()
+        if bounded:
+            self.check()
+
+        queued_at = time.monotonic()
+        entry = (priority, next(self._order), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        if not bounded:
+            self.background_waiting += 1
+        try:
+            await asyncio.wait_for(entry[2], self.queue_timeout if bounded else None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if entry[2].done() and not entry[2].cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self.release(time.monotonic())
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise self._overloaded("timed out waiting")
+            raise
+        finally:
+            if not bounded:
+                self.background_waiting -= 1
+        self.admitted += 1
+        admitted_at = time.monotonic()
+        observe_stage(self.queue_stage, admitted_at - queued_at)
+        return admitted_at
+
+    def release(self, acquired_at: float) -> None:
+        self._avg_hold_seconds = 0.8 * self._avg_hold_seconds + 0.2 * (time.monotonic() - acquired_at)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self, priority: int = DEFAULT_PRIORITY):
+        acquired_at = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters) - self.background_waiting,
+            "background_queued": self.background_waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
+
+
+class RateLimiter:
+    """Per-client token buckets: ``burst`` requests at once, refilled at ``per_minute``.
+
+    The least recently seen clients are forgotten beyond ``max_clients``.
+    """
+
+    def __init__(self, name: str, per_minute: int, burst: int, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.name = name
+        self.per_second = per_minute / 60
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    def check(self, client: str) -> None:
+        if self.per_second <= 0:
+            return
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.per_second)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            self.limited += 1
+            retry_after = max(1, math.ceil((1 - tokens) / self.per_second))
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many {self.name} requests. Please retry in {retry_after}s.",
+                headers={"Retry-After": str(retry_after)}
+            )
+        self._buckets[client] = (tokens - 1, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_minute": round(self.per_second * 60),
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "limited": self.limited
+        }
+
+
+def _key_digest(api_key: str) -> str:
+    # Keys are only compared, so don't keep them in memory in the clear
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+# An unknown key gets no bucket of its own, or rotating keys would dodge the limit
+KNOWN_KEY_DIGESTS = frozenset(_key_digest(key) for key in RATE_LIMIT_API_KEYS)
+
+
+def client_key(request: Request) -> str:
+    """Identify a client by a configured API key, or by IP address otherwise"""
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        digest = _key_digest(api_key)
+        if digest in KNOWN_KEY_DIGESTS:
+            return "key:" + digest
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+chat_gate = AdmissionGate("Chat", CHAT_MAX_CONCURRENCY, CHAT_QUEUE_SIZE, CHAT_QUEUE_TIMEOUT_SECONDS)
+ingest_gate = AdmissionGate("Ingestion", INGEST_MAX_CONCURRENCY, INGEST_QUEUE_SIZE, INGEST_QUEUE_TIMEOUT_SECONDS)
+chat_rate = RateLimiter("chat", CHAT_RATE_PER_MINUTE, CHAT_RATE_BURST)
+ingest_rate = RateLimiter("ingestion", INGEST_RATE_PER_MINUTE, INGEST_RATE_BURST)
+
+
+async def limit_chat_rate(request: Request) -> None:
+    """Route dependency applying the per-client chat rate limit"""
+    chat_rate.check(client_key(request))
+
+
+async def limit_ingest_rate(request: Request) -> None:
+    """Route dependency applying the per-client ingestion rate limit"""
+    ingest_rate.check(client_key(request))
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "chat": chat_gate.stats(),
+        "ingestion": ingest_gate.stats(),
+        "chat_rate": chat_rate.stats(),
+        "ingestion_rate": ingest_rate.stats()
+    }
@@ -0,0 +1,90 @@
+from app.config import ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_PER_VIDEO, ANSWER_CACHE_MAX_VIDEOS
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """Per-video cache of answers keyed on the query embedding.
+
+    Cached values are whatever the caller stores (the answer and its sources).
+    A lookup returns a cached value when the cosine similarity between the
+    new query and a previously answered one reaches the threshold. Both the
+    answers within a video and the videos themselves are evicted LRU.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_per_video: int = ANSWER_CACHE_MAX_PER_VIDEO,
+        max_videos: int = ANSWER_CACHE_MAX_VIDEOS
+    ):
+        self.threshold = threshold
+        self.max_per_video = max_per_video
+        self.max_videos = max_videos
+        self._videos: "OrderedDict[str, List[Tuple[np.ndarray, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, video_id: str, query_vector) -> Optional[Any]:
+        with self._lock:
+            entries = self._videos.get(video_id)
+            if not entries:
+                self.misses += 1
+                return None
+
+            query = self._normalize(query_vector)
+            scores = np.stack([vector for vector, _ in entries]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            # Move the matched answer to the end so it is evicted last
+            entries.append(entries.pop(best))
+            self._videos.move_to_end(video_id)
+            self.hits += 1
+            return entries[-1][1]
+
+    def store(self, video_id: str, query_vector, answer: Any) -> None:
+        with self._lock:
+            entries = self._videos.setdefault(video_id, [])
+            self._videos.move_to_end(video_id)
+            entries.append((self._normalize(query_vector), answer))
+            if len(entries) > self.max_per_video:
+                entries.pop(0)
+                self.evictions += 1
+            while len(self._videos) > self.max_videos:
+                _, dropped = self._videos.popitem(last=False)
+                self.evictions += len(dropped)
+
+    def invalidate(self, video_id: str) -> None:
+        with self._lock:
+            if self._videos.pop(video_id, None) is not None:
+                logger.info(f"Invalidated cached answers for video {video_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "videos": len(self._videos),
+                "answers": sum(len(entries) for entries in self._videos.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "threshold": self.threshold
+            }
+
+
+answer_cache = AnswerCache()
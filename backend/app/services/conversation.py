@@ -0,0 +1,163 @@
+from app.config import (
+    CHAT_CONTEXT_TOKEN_BUDGET, CHAT_HISTORY_TOKEN_BUDGET,
+    CONVERSATION_MAX_TURNS, CONVERSATION_MAX_SESSIONS, CONVERSATION_IDLE_TTL_SECONDS
+)
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import logging
+import time
+import re
+
+logger = logging.getLogger(__name__)
+
+NO_HISTORY = "No previous questions."
+# Older turns that no longer fit verbatim keep roughly this much of their answer
+CONDENSED_ANSWER_TOKENS = 60
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+def condense(text: str, max_tokens: int) -> str:
+    """Keep the leading sentences of text that fit in max_tokens"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    kept = ""
+    for sentence in SENTENCE_END.split(text):
+        if len(kept) + len(sentence) + 1 > max_chars:
+            break
+        kept = f"{kept} {sentence}" if kept else sentence
+    return (kept or text[:max_chars].rsplit(" ", 1)[0]) + " …"
+
+
+def chunk_key(doc) -> Tuple:
+    """Identity of a transcript chunk, so the same chunk is only sent once"""
+    if "start" in doc.metadata:
+        return (doc.metadata["start"], doc.metadata.get("end"))
+    return (doc.page_content,)
+
+
+class ConversationStore:
+    """Recent question/answer turns per (video, session), kept in memory.
+
+    Sessions idle for longer than the TTL, and the least recently used
+    sessions beyond the cap, are dropped. Each turn keeps the chunks
+    retrieved for it so follow-up questions can reuse them.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = CONVERSATION_MAX_TURNS,
+        max_sessions: int = CONVERSATION_MAX_SESSIONS,
+        idle_ttl: int = CONVERSATION_IDLE_TTL_SECONDS
+    ):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now: float) -> None:
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if now - session["last_used"] <= self.idle_ttl:
+                break
+            del self._sessions[key]
+
+    def turns(self, video_id: str, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        if not session_id:
+            return []
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            session = self._sessions.get((video_id, session_id))
+            return list(session["turns"]) if session else []
+
+    def add_turn(self, video_id: str, session_id: Optional[str], question: str, answer: str, docs) -> None:
+        if not session_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            key = (video_id, session_id)
+            session = self._sessions.setdefault(key, {"turns": [], "last_used": now})
+            session["turns"].append({"question": question, "answer": answer, "docs": list(docs)})
+            del session["turns"][:-self.max_turns]
+            session["last_used"] = now
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def invalidate(self, video_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._sessions if key[0] == video_id]:
+                del self._sessions[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "turns": sum(len(session["turns"]) for session in self._sessions.values())
+            }
+
+
+def assemble_history(turns: List[Dict[str, Any]], budget: int) -> Tuple[str, int]:
+    """Render the conversation newest-first into the budget, returning (text, tokens used).
+
+    Recent turns are kept verbatim. Once one doesn't fit, it and every older
+    turn are condensed to the question plus the start of the answer, and
+    turns that don't fit even condensed are dropped.
+    """
+    lines, used, condensing = [], 0, False
+    for turn in reversed(turns):
+        text = f"User: {turn['question']}\nAssistant: {turn['answer']}"
+        cost = estimate_tokens(text)
+        if condensing or used + cost > budget:
+            condensing = True
+            text = f"User: {turn['question']}\nAssistant: {condense(turn['answer'], CONDENSED_ANSWER_TOKENS)}"
+            cost = estimate_tokens(text)
+            if used + cost > budget:
+                break
+        lines.append(text)
+        used += cost
+    return "\n\n".join(reversed(lines)), used
+
+
+def assemble_context(
+    turns: List[Dict[str, Any]],
+    docs,
+    budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+    history_budget: int = CHAT_HISTORY_TOKEN_BUDGET
+) -> Tuple[str, list]:
+    """Fit conversation history and transcript chunks into one token budget.
+
+    Chunks retrieved for the current question come first, then the history,
+    then chunks from the previous turn so follow-ups like "explain that more"
+    still see what the last answer was based on. A chunk appears at most once.
+    Returns the history text for the prompt and the chunks to send.
+    """
+    selected, seen, used = [], set(), 0
+
+    def add(candidates):
+        nonlocal used
+        for doc in candidates:
+            key = chunk_key(doc)
+            cost = estimate_tokens(doc.page_content)
+            if key in seen or used + cost > budget:
+                continue
+            seen.add(key)
+            selected.append(doc)
+            used += cost
+
+    add(docs)
+    history, history_tokens = assemble_history(turns, min(history_budget, budget - used))
+    used += history_tokens
+    if turns:
+        add(turns[-1]["docs"])
+    return history or NO_HISTORY, selected
+
+
+conversations = ConversationStore()
@@ -0,0 +1,95 @@
+from app.config import DOWNLOAD_WORKERS, DOWNLOAD_FRAGMENT_CONCURRENCY, DOWNLOAD_PROGRESS_INTERVAL_MS
+from app.services.jobs import Job, JobManager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_TYPES = ("video", "audio")
+
+# yt-dlp blocks for the whole download, so downloads get their own threads
+# rather than tying up the default pool used for transcript and cache I/O
+download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="download")
+
+# Identical in-flight requests (same video, type and directory) share one job
+download_jobs = JobManager(max_concurrency=DOWNLOAD_WORKERS, name="Download")
+
+
+def validate_output_path(output_path: str) -> str:
+    """Only allow relative directories that stay inside the working directory"""
+    path = Path(output_path or "downloads")
+    if path.is_absolute() or ".." in path.parts:
+        raise HTTPException(status_code=400, detail="output_path must be a relative directory without '..'")
+    return str(path)
+
+
+def make_progress_hook(job: Job) -> Callable[[Dict[str, Any]], None]:
+    """yt-dlp progress hook that records progress on the job, at most every interval"""
+    interval = DOWNLOAD_PROGRESS_INTERVAL_MS / 1000
+    last_update = 0.0
+
+    def hook(status: Dict[str, Any]) -> None:
+        nonlocal last_update
+        now = time.monotonic()
+        # Always report state changes; throttle the stream of "downloading" ticks
+        if status.get("status") == "downloading" and now - last_update < interval:
+            return
+        last_update = now
+        downloaded = status.get("downloaded_bytes") or 0
+        total = status.get("total_bytes") or status.get("total_bytes_estimate") or 0
+        progress = {
+            "downloaded_bytes": downloaded,
+            "total_bytes": total,
+            "speed": int(status.get("speed") or 0),
+            "eta": int(status.get("eta") or 0)
+        }
+        if total:
+            progress["percent"] = round(downloaded * 100 / total, 1)
+        if status.get("fragment_count"):
+            progress["fragment_index"] = status.get("fragment_index") or 0
+            progress["fragment_count"] = status["fragment_count"]
+        job.update(stage=status.get("status", "downloading"), **progress)
+
+    return hook
+
+
+async def run_download(job: Job, video_id: str, download_type: str, output_path: str, convert: bool = True) -> Dict[str, Any]:
+    # Imported on first use so yt-dlp isn't loaded at startup
+    from youtube_downloader import download_audio, download_video
+
+    download = partial(download_audio, convert=convert) if download_type == "audio" else download_video
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    job.update(stage="extracting_info")
+    result = await asyncio.get_running_loop().run_in_executor(
+        download_executor,
+        partial(download, url, output_path, make_progress_hook(job), DOWNLOAD_FRAGMENT_CONCURRENCY)
+    )
+    if result["status"] != "success":
+        raise RuntimeError(result["error"])
+    logger.info(f"Downloaded {download_type} for video {video_id} to {result['file_path']}")
+    return {**result, "download_type": download_type}
+
+
+def submit_download(video_id: str, download_type: str, output_path: str) -> Job:
+    if download_type not in DOWNLOAD_TYPES:
+        raise HTTPException(status_code=400, detail=f"download_type must be one of {DOWNLOAD_TYPES}")
+    output_path = validate_output_path(output_path)
+    job = download_jobs.submit(
+        video_id,
+        lambda job: run_download(job, video_id, download_type, output_path),
+        key=f"{video_id}:{download_type}:{output_path}"
+    )
+    # Known before the download finishes, so in-progress responses can report it
+    if job.result is None:
+        job.result = {"download_type": download_type}
+    return job
+
+
+def download_type_of(job: Job) -> str:
+    return (job.result or {}).get("download_type")
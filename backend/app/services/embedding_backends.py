@@ -0,0 +1,50 @@
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+from app.config import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_INT8_FILE
+from typing import Any, Dict, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def backend_model_kwargs(backend: str) -> Dict[str, Any]:
+    """SentenceTransformer keyword arguments selecting the inference backend"""
+    if backend == "torch":
+        return {}
+    if backend == "onnx":
+        return {"backend": "onnx"}
+    if backend == "onnx-int8":
+        return {"backend": "onnx", "model_kwargs": {"file_name": EMBEDDING_ONNX_INT8_FILE}}
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {EMBEDDING_BACKENDS}")
+
+
+def embedding_cache_namespace(model_name: str, backend: str) -> str:
+    """Name under which a backend's vectors are cached.
+
+    Quantized and ONNX vectors differ slightly from the PyTorch ones, so each
+    backend gets its own cache keys. PyTorch keeps the bare model name so
+    vectors cached before backends were configurable stay valid.
+    """
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def create_embeddings(
+    backend: str = EMBEDDING_BACKEND,
+    model_name: str = EMBEDDING_MODEL_NAME
+) -> Tuple[Embeddings, str]:
+    """Load the embedding model on the configured backend.
+
+    Returns the embeddings and the backend actually in use. ONNX backends need
+    ``optimum[onnxruntime]``; when they cannot be loaded the PyTorch model is
+    used instead so the service still starts.
+    """
+    model_kwargs = backend_model_kwargs(backend)
+    try:
+        return HuggingFaceEmbeddings(model_name=model_name, model_kwargs=model_kwargs), backend
+    except Exception as e:
+        if backend == "torch":
+            raise
+        logger.warning(f"Failed to load {backend} embedding backend, falling back to torch: {e}")
+        return HuggingFaceEmbeddings(model_name=model_name), "torch"
@@ -0,0 +1,107 @@
+from app.config import EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MAX_WAIT_MS, EMBEDDING_WORKERS
+from app.services.executor import run_in_embedding_pool
+from app.services.metrics import Histogram
+from typing import Callable, List, Optional, Tuple, Dict, Any
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class EmbeddingBatcher:
+    """Gathers embedding requests from concurrent callers into shared forward passes.
+
+    Texts queued by ingestion and chat requests are collected until the batch
+    reaches ``max_batch_size`` texts or the oldest request has waited
+    ``max_wait_ms``. One model call then embeds the whole batch and the vectors
+    are handed back to each caller. Requests are never split across batches.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        max_wait_ms: int = EMBEDDING_MAX_WAIT_MS,
+        max_concurrent_batches: int = EMBEDDING_WORKERS
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.create_task(self._collect())
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts as part of the next shared batch"""
+        if not texts:
+            return []
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            # Start collecting the next batch while this one runs
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run(batch))
+            task.add_done_callback(lambda _: self._slots.release())
+
+    async def _run(self, batch: List[Tuple[List[str], asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        texts = [text for request_texts, _, _ in batch for text in request_texts]
+        for _, _, queued_at in batch:
+            self.queue_wait_ms.observe((started - queued_at) * 1000)
+        self.batch_sizes.observe(len(texts))
+
+        try:
+            vectors = await run_in_embedding_pool(self.embed_fn, texts)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future, _ in batch:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
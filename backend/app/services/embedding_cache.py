@@ -0,0 +1,133 @@
+from langchain_core.embeddings import Embeddings
+from app.config import EMBEDDING_CACHE_PATH
+from typing import Dict, List
+import numpy as np
+import asyncio
+import threading
+import hashlib
+import logging
+import sqlite3
+import os
+
+logger = logging.getLogger(__name__)
+
+# Stay well under SQLite's limit on bound parameters per statement
+_QUERY_BATCH = 500
+
+
+class EmbeddingCache:
+    """SQLite store of embedding vectors keyed by a content hash"""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Shared by the embedding pool threads, so serialize access with a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _QUERY_BATCH):
+                batch = keys[start:start + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only embeds chunk texts it has never seen.
+
+    Keys are a hash of (model name, text), so switching models never serves
+    stale vectors. Duplicate texts within one call are embedded once.
+    Queries bypass the cache since they are rarely repeated verbatim.
+    The async methods send cache misses through the shared embedding batcher.
+    """
+
+    def __init__(self, base: Embeddings, model_name: str, cache: EmbeddingCache, batcher=None):
+        self.base = base
+        self.model_name = model_name
+        self.cache = cache
+        self.batcher = batcher
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, texts: List[str]):
+        """Return (keys, cached vectors by key, uncached texts by key)"""
+        keys = [self._key(text) for text in texts]
+        try:
+            vectors = self.cache.get_many(list(set(keys)))
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache read failed: {e}")
+            vectors = {}
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        self.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+        return keys, vectors, missing
+
+    def _store(self, computed: Dict[str, List[float]]) -> None:
+        try:
+            self.cache.put_many(computed)
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache write failed: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        if missing:
+            computed = dict(zip(missing.keys(), self.base.embed_documents(list(missing.values()))))
+            vectors.update(computed)
+            self._store(computed)
+        return [vectors[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.batcher is None:
+            return await asyncio.to_thread(self.embed_documents, texts)
+
+        keys, vectors, missing = await asyncio.to_thread(self._lookup, texts)
+        if missing:
+            computed = dict(zip(missing.keys(), await self.batcher.embed(list(missing.values()))))
+            vectors.update(computed)
+            await asyncio.to_thread(self._store, computed)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.batcher is None:
+            return await asyncio.to_thread(self.embed_query, text)
+        return (await self.batcher.embed([text]))[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
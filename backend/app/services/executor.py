@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.config import EMBEDDING_WORKERS
+from functools import partial
+import asyncio
+
+# Embedding runs in torch, which releases the GIL, so a thread pool is enough
+# to keep it off the event loop while capping how many cores it competes for.
+embedding_executor = ThreadPoolExecutor(
+    max_workers=EMBEDDING_WORKERS,
+    thread_name_prefix="embedding"
+)
+
+
+async def run_in_embedding_pool(func, *args, **kwargs):
+    """Run a CPU-bound callable in the embedding pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(embedding_executor, partial(func, *args, **kwargs))
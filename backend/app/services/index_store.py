@@ -0,0 +1,199 @@
+from langchain_community.vectorstores import FAISS
+from app.config import INDEX_CACHE_DIR, INDEX_CACHE_MAX_BYTES, INDEX_MMAP
+from typing import Optional, Dict, Any
+import logging
+import time
+import faiss
+import pickle
+import shutil
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+LEXICAL_FILE = "lexical.pkl"
+# Written by FAISS.save_local
+FAISS_INDEX_FILE = "index.faiss"
+FAISS_DOCSTORE_FILE = "index.pkl"
+# How long a measured cache size is reused; other workers may change it meanwhile
+TOTAL_BYTES_TTL_SECONDS = 30.0
+
+# Maps the vector codes of flat, SQ and PQ indexes instead of copying them
+# into memory; older FAISS builds without it read indexes normally
+MMAP_FLAGS = (
+    faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC") else None
+)
+
+
+class IndexStore:
+    """Persistent on-disk cache of FAISS indexes keyed by video_id.
+
+    Each video gets its own directory holding the serialized FAISS index,
+    its docstore (chunk text and metadata), its BM25 index and a small ``meta.json``.
+    The total size is capped and the least recently used videos are evicted.
+
+    Loaded indexes are memory-mapped read-only (``INDEX_MMAP``), so worker
+    processes serving the same video share one copy through the page cache.
+    A mapped index must never be added to; FAISS aborts the process if it is.
+    """
+
+    def __init__(self, root: str = INDEX_CACHE_DIR, max_bytes: int = INDEX_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self._measured_at = 0.0
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, video_id: str) -> str:
+        # Video IDs are URL-safe base64, but never trust them as paths
+        safe_id = "".join(c for c in video_id if c.isalnum() or c in "-_")
+        if not safe_id:
+            # An empty name would resolve to the cache root itself
+            raise ValueError(f"Invalid video ID: {video_id!r}")
+        return os.path.join(self.root, safe_id)
+
+    def exists(self, video_id: str) -> bool:
+        try:
+            return os.path.exists(os.path.join(self._path(video_id), META_FILE))
+        except ValueError:
+            return False
+
+    def save(self, video_id: str, vector_store: FAISS, meta: Dict[str, Any], lexical=None) -> None:
+        """Serialize a vector store to disk, replacing any previous copy"""
+        path = self._path(video_id)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            vector_store.save_local(tmp_path)
+            if lexical is not None:
+                with open(os.path.join(tmp_path, LEXICAL_FILE), "wb") as f:
+                    pickle.dump(lexical, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(tmp_path, META_FILE), "w") as f:
+                json.dump(meta, f)
+            # Swap the fully written directory in so readers never see a partial index
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved index for video {video_id} to {path}")
+        except Exception as e:
+            logger.error(f"Failed to save index for video {video_id}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def load(self, video_id: str, embeddings, touch: bool = True) -> Optional[Dict[str, Any]]:
+        """Load a cached vector store, returning None when it is not cached.
+
+        ``touch=False`` leaves the video's place in the eviction order alone,
+        for bulk loads that are not a sign of use.
+        """
+        if not self.exists(video_id):
+            return None
+        path = self._path(video_id)
+
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+            vector_store = self._read_vector_store(path, embeddings)
+        except Exception as e:
+            logger.error(f"Failed to load cached index for video {video_id}: {e}")
+            self.delete(video_id)
+            return None
+
+        lexical = None
+        lexical_path = os.path.join(path, LEXICAL_FILE)
+        if os.path.exists(lexical_path):
+            try:
+                with open(lexical_path, "rb") as f:
+                    lexical = pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable BM25 index for video {video_id}: {e}")
+
+        if touch:
+            # Touch the metadata file so LRU eviction sees this video as recently used
+            os.utime(os.path.join(path, META_FILE))
+        logger.info(f"Loaded cached index for video {video_id}")
+        return {"vector_store": vector_store, "lexical": lexical, "meta": meta}
+
+    def _read_vector_store(self, path: str, embeddings) -> FAISS:
+        """Equivalent of FAISS.load_local that memory-maps the index when possible"""
+        index_path = os.path.join(path, FAISS_INDEX_FILE)
+        index = None
+        if INDEX_MMAP and MMAP_FLAGS is not None:
+            try:
+                index = faiss.read_index(index_path, MMAP_FLAGS)
+            except RuntimeError as e:
+                logger.warning(f"Could not memory-map {index_path}, reading it instead: {e}")
+        if index is None:
+            index = faiss.read_index(index_path)
+        # The docstore is pickled by FAISS.save_local; we only ever read our own files
+        with open(os.path.join(path, FAISS_DOCSTORE_FILE), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+    def delete(self, video_id: str) -> bool:
+        """Remove a cached index; raises ValueError for IDs that aren't usable as names"""
+        path = self._path(video_id)
+        if os.path.abspath(path) == os.path.abspath(self.root) or not os.path.exists(path):
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        self._total_bytes = None
+        return True
+
+    def _entries(self):
+        """Return (last_used, size_bytes, video_id) for every cached index"""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for name in os.listdir(self.root):
+            if ".tmp-" in name:
+                continue
+            path = os.path.join(self.root, name)
+            meta_path = os.path.join(path, META_FILE)
+            if not os.path.isfile(meta_path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, f))
+                for f in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(meta_path), size, name))
+        return entries
+
+    def video_ids(self):
+        """IDs of every cached video, most recently used first"""
+        return [name for _, _, name in sorted(self._entries(), reverse=True)]
+
+    def total_bytes(self) -> int:
+        """Size of the cache on disk; walks the cache directory unless a recent measurement exists"""
+        if self._total_bytes is None or time.monotonic() - self._measured_at > TOTAL_BYTES_TTL_SECONDS:
+            self._remember_total(sum(size for _, size, _ in self._entries()))
+        return self._total_bytes
+
+    @property
+    def cached_total_bytes(self) -> Optional[int]:
+        """Last measured size, without touching the disk"""
+        return self._total_bytes
+
+    def _remember_total(self, total: int) -> None:
+        self._total_bytes = total
+        self._measured_at = time.monotonic()
+
+    def evict(self) -> int:
+        """Remove least recently used indexes until the cache fits its size cap"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            total -= size
+            evicted += 1
+            logger.info(f"Evicted cached index for video {name}")
+        self._remember_total(total)
+        return evicted
+
+
+index_store = IndexStore()
@@ -0,0 +1,92 @@
+from app.config import INDEX_TYPE, INDEX_SQ8_MIN_CHUNKS, INDEX_PQ_MIN_CHUNKS
+import numpy as np
+import logging
+import faiss
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "sq8", "pq")
+
+# PQ trains 256 centroids per sub-quantizer; below this many vectors it
+# cannot train reliably, so smaller indexes fall back to SQ8
+PQ_MIN_TRAINING_VECTORS = 256 * 39
+# Training time grows with the sample, so large indexes train on a subset
+PQ_MAX_TRAINING_VECTORS = 256 * 64
+
+
+def choose_index_type(n_vectors: int, index_type: str = INDEX_TYPE) -> str:
+    """Resolve "auto" to a concrete index type based on the number of chunks"""
+    if index_type != "auto":
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES} or 'auto'")
+        if index_type == "pq" and n_vectors < PQ_MIN_TRAINING_VECTORS:
+            return "sq8"
+        return index_type
+    if n_vectors >= max(INDEX_PQ_MIN_CHUNKS, PQ_MIN_TRAINING_VECTORS):
+        return "pq"
+    if n_vectors >= INDEX_SQ8_MIN_CHUNKS:
+        return "sq8"
+    return "flat"
+
+
+def pq_subquantizers(dim: int) -> int:
+    """Smallest divisor of dim giving at most 2 dimensions per sub-quantizer.
+
+    Coarser splits (4 or 8 dimensions each) shrink the index further but
+    drop recall@4 well below 0.9 on sentence embeddings.
+    """
+    m = max(1, dim // 2)
+    while dim % m:
+        m += 1
+    return m
+
+
+def build_index(vectors: np.ndarray, index_type: str) -> faiss.Index:
+    """Build and fill an L2 index of the given type from float32 vectors.
+
+    ``sq8`` stores one byte per dimension (4x smaller than flat); ``pq``
+    stores one byte per sub-quantizer (8x smaller for MiniLM).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1]
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    elif index_type == "pq":
+        index = faiss.IndexPQ(dim, pq_subquantizers(dim), 8)
+    else:
+        raise ValueError(f"Unknown index type {index_type!r}")
+
+    if not index.is_trained:
+        training = vectors
+        if len(vectors) > PQ_MAX_TRAINING_VECTORS:
+            rng = np.random.default_rng(0)
+            training = vectors[rng.choice(len(vectors), PQ_MAX_TRAINING_VECTORS, replace=False)]
+        index.train(training)
+    index.add(vectors)
+    return index
+
+
+def index_type_of(index: faiss.Index) -> str:
+    if isinstance(index, faiss.IndexPQ):
+        return "pq"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    return "flat"
+
+
+def compress_index(index: faiss.Index, index_type: str = INDEX_TYPE) -> faiss.Index:
+    """Re-encode a flat index as the configured (or automatically chosen) type.
+
+    Returns the original index when no compression applies.
+    """
+    chosen = choose_index_type(index.ntotal, index_type)
+    if chosen == "flat" or not isinstance(index, faiss.IndexFlat):
+        return index
+    compressed = build_index(index.reconstruct_n(0, index.ntotal), chosen)
+    logger.info(
+        f"Compressed index of {index.ntotal} vectors to {chosen} "
+        f"({index.code_size} -> {compressed.code_size} bytes per vector)"
+    )
+    return compressed
@@ -0,0 +1,203 @@
+from app.config import INGEST_JOB_WORKERS, INGEST_JOB_HISTORY, WORKERS
+from app.services.video_state import video_states
+from app.services.metrics import record_error
+from fastapi import HTTPException
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap between writes of job state to the shared store
+PUBLISH_INTERVAL_SECONDS = 0.5
+
+
+class Job:
+    """State of one background job (an ingestion or a download)"""
+
+    def __init__(self, video_id: str, on_update: Optional[Callable[["Job"], None]] = None, key: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.key = key or video_id
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self._listeners: List[Callable[["Job"], None]] = [on_update] if on_update is not None else []
+
+    def add_listener(self, listener: Callable[["Job"], None]) -> None:
+        """Call listener (possibly from a worker thread) after every state change"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[["Job"], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def update(self, stage: Optional[str] = None, **progress: Any) -> None:
+        """Record the current stage and progress counters (safe to call from worker threads)"""
+        if stage is not None:
+            self.stage = stage
+        self.progress.update(progress)
+        self.updated_at = datetime.now().isoformat()
+        for listener in list(self._listeners):
+            listener(self)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "video_id": self.video_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class JobManager:
+    """Runs ingestion jobs in the background with bounded concurrency.
+
+    Only one active job exists per key (the video ID unless another key is
+    given); submitting a key that already has a queued or running job
+    returns that job. Finished jobs are kept
+    for polling until the history limit pushes them out. With a shared
+    store, job state is also written there so jobs can be polled from
+    other worker processes. Writes happen on a worker thread and bursts of
+    updates are coalesced, so progress updates never wait on SQLite.
+    """
+
+    def __init__(self, max_concurrency: int = INGEST_JOB_WORKERS, history: int = INGEST_JOB_HISTORY, shared_store=None, name: str = "Ingestion"):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.history = history
+        self.shared_store = shared_store
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._tasks = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Jobs whose latest state has not been written to the shared store yet
+        self._unpublished: Dict[str, Job] = {}
+        self._publisher: Optional[asyncio.Task] = None
+
+    def submit(self, video_id: str, func: Callable[[Job], Awaitable[Any]], key: Optional[str] = None) -> Job:
+        job = self._active.get(key or video_id)
+        if job is not None:
+            return job
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = asyncio.get_running_loop()
+
+        job = Job(video_id, on_update=self._publish if self.shared_store is not None else None, key=key)
+        self._jobs[job.id] = job
+        self._active[job.key] = job
+        self._prune()
+
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.create_task(self._run(job, func))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, func: Callable[[Job], Awaitable[Any]]) -> None:
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.update(stage="starting")
+                job.result = await func(job)
+            job.status = "completed"
+            job.update(stage="ready")
+            logger.info(f"{self.name} job {job.id} for video {job.video_id} completed")
+        except (Exception, asyncio.CancelledError) as e:
+            # A build cancelled by deleting the video fails the job instead of leaving it running
+            job.status = "failed"
+            job.error = e.detail if isinstance(e, HTTPException) else (str(e) or type(e).__name__)
+            job.update(stage="failed")
+            logger.error(f"{self.name} job {job.id} for video {job.video_id} failed: {job.error}")
+            record_error(e, f"{self.name.lower()}_job")
+        finally:
+            self._active.pop(job.key, None)
+
+    def _publish(self, job: Job) -> None:
+        # Job updates may come from worker threads
+        self._loop.call_soon_threadsafe(self._mark_unpublished, job)
+
+    def _mark_unpublished(self, job: Job) -> None:
+        self._unpublished[job.id] = job
+        if self._publisher is None or self._publisher.done():
+            self._publisher = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """Write the latest state of every updated job, then wait before writing again"""
+        while self._unpublished:
+            snapshots = [job.to_dict() for job in self._unpublished.values()]
+            self._unpublished.clear()
+            try:
+                await asyncio.to_thread(self._write, snapshots)
+            except Exception as e:
+                logger.warning(f"Failed to publish {len(snapshots)} jobs: {e}")
+            await asyncio.sleep(PUBLISH_INTERVAL_SECONDS)
+
+    def _write(self, snapshots: List[Dict[str, Any]]) -> None:
+        for snapshot in snapshots:
+            self.shared_store.put_job(snapshot)
+
+    async def wait(self, job: Job) -> Job:
+        """Wait until a job has completed or failed"""
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Event()
+        listener = lambda job: loop.call_soon_threadsafe(finished.set) if job.done else None
+        job.add_listener(listener)
+        try:
+            if not job.done:
+                await finished.wait()
+        finally:
+            job.remove_listener(listener)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active_job(self, key: str) -> Optional[Job]:
+        """The queued or running job for a key, which ``submit`` would return"""
+        return self._active.get(key)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job state from this process, or from the shared store if another worker runs it"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.shared_store is not None:
+            return self.shared_store.get_job(job_id)
+        return None
+
+    def _prune(self) -> None:
+        while len(self._jobs) > self.history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.done:
+                break
+            del self._jobs[oldest_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self._active),
+            "tracked": len(self._jobs),
+            "max_concurrency": self.max_concurrency
+        }
+
+
+# Job state only needs sharing when requests can land on another worker
+ingest_jobs = JobManager(shared_store=video_states if WORKERS > 1 else None)
@@ -0,0 +1,74 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; numbers and codes like "rtx4090" stay whole"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Inverted index scoring chunks with Okapi BM25.
+
+    Documents are identified by their position, which matches their position
+    in the video's FAISS index because both are built in the same order.
+    The index is built incrementally during ingestion so a query only has
+    to walk the postings of its own terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            position = len(self.doc_lengths)
+            terms = Counter(tokenize(text))
+            for term, frequency in terms.items():
+                self.postings[term].append((position, frequency))
+            length = sum(terms.values())
+            self.doc_lengths.append(length)
+            self.total_length += length
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (position, score) pairs, best first"""
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / avg_length)
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def estimated_bytes(self) -> int:
+        # Rough CPython cost of a posting tuple plus the list slot holding it
+        n_postings = sum(len(postings) for postings in self.postings.values())
+        return n_postings * 72 + len(self.doc_lengths) * 8
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """Fuse several rankings of document positions into one, best first"""
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, position in enumerate(ranking):
+            scores[position] += 1 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
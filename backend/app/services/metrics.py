@@ -0,0 +1,224 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Cumulative bucketed histogram, in the style of a Prometheus histogram"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 3),
+                "buckets": {str(bound): n for bound, n in zip(self.buckets, self._counts)}
+            }
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, labelnames: Sequence[str] = ()):
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class HistogramFamily:
+    """A set of histograms sharing buckets, one per label value"""
+
+    def __init__(self, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.buckets = buckets
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        key = tuple(str(value) for value in values)
+        with self._lock:
+            if key not in self._children:
+                self._children[key] = Histogram(self.buckets)
+            return self._children[key]
+
+    def children(self) -> Dict[Tuple[str, ...], Histogram]:
+        with self._lock:
+            return dict(self._children)
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text exposition format.
+
+    Counters and histograms are updated on the hot path. Callback metrics
+    read a value (or a dict of label value -> value) from a service's own
+    bookkeeping when scraped, so nothing is counted twice.
+    """
+
+    def __init__(self, prefix: str = "ytrag_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, Tuple[str, str, Any, Tuple[str, ...]]] = {}
+
+    def _register(self, name: str, kind: str, help: str, metric: Any, labelnames: Sequence[str] = ()) -> Any:
+        self._metrics[self.prefix + name] = (kind, help, metric, tuple(labelnames))
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(name, "counter", help, Counter(labelnames), labelnames)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()) -> HistogramFamily:
+        return self._register(name, "histogram", help, HistogramFamily(buckets, labelnames), labelnames)
+
+    def callback(self, name: str, help: str, fn: Callable[[], Any], kind: str = "gauge", labelname: Optional[str] = None) -> None:
+        self._register(name, kind, help, fn, (labelname,) if labelname else ())
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, metric, labelnames) in self._metrics.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(metric, HistogramFamily):
+                for key, histogram in metric.children().items():
+                    lines.extend(_histogram_lines(name, dict(zip(labelnames, key)), histogram.snapshot()))
+                continue
+            if isinstance(metric, Counter):
+                samples = metric.samples()
+            else:
+                try:
+                    value = metric()
+                except Exception as e:
+                    logger.warning(f"Skipping metric {name}: {e}")
+                    continue
+                samples = {(str(k),): v for k, v in value.items()} if isinstance(value, dict) else {(): value}
+            for key, value in samples.items():
+                if value is None:
+                    continue
+                lines.append(f"{name}{_labels(dict(zip(labelnames, key)))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _histogram_lines(name: str, labels: Dict[str, str], snapshot: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"{name}_bucket{_labels({**labels, 'le': bound})} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {snapshot['count']}")
+    lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Hot-path stages of ingestion and chat; see observe_stage
+stage_duration = registry.histogram(
+    "stage_duration_seconds", "Time spent in each ingestion and chat stage", STAGE_SECONDS_BUCKETS, ("stage",)
+)
+errors = registry.counter("errors_total", "Errors by exception type and where they happened", ("type", "source"))
+
+# Stage timings of the request being served, for the Server-Timing header
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage's duration, adding it to the current request's timings"""
+    stage_duration.labels(stage).observe(seconds)
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+# Chat timings (milliseconds, as returned to clients) and their stage names
+CHAT_STAGES = {
+    "embed_ms": "query_embedding",
+    "retrieval_ms": "retrieval",
+    "rerank_ms": "rerank",
+    "prompt_ms": "prompt_assembly",
+    "ttft_ms": "llm_first_token",
+    "llm_ms": "llm",
+    "total_ms": "chat_total"
+}
+context_chunks = registry.histogram(
+    "chat_context_chunks", "Transcript chunks included in each chat prompt", (0, 1, 2, 3, 4, 6, 8, 12, 16)
+).labels()
+context_tokens = registry.histogram(
+    "chat_context_tokens", "Estimated prompt tokens of transcript and history", (250, 500, 1000, 1500, 2000, 3000, 4000, 6000)
+).labels()
+
+
+def record_chat_timings(timings: Dict[str, float]) -> None:
+    """Record the stage durations and prompt size of one chat"""
+    for key, stage in CHAT_STAGES.items():
+        if key in timings:
+            observe_stage(stage, timings[key] / 1000)
+    if "chunks" in timings:
+        context_chunks.observe(timings["chunks"])
+    if "context_tokens" in timings:
+        context_tokens.observe(timings["context_tokens"])
+
+
+def chat_stage_stats() -> Dict[str, Any]:
+    return {
+        **{stage: stage_duration.labels(stage).snapshot() for stage in CHAT_STAGES.values()},
+        "chunks": context_chunks.snapshot(),
+        "context_tokens": context_tokens.snapshot()
+    }
+
+
+def record_error(error: BaseException, source: str) -> None:
+    """Count an error; HTTP errors are told apart by status code"""
+    status_code = getattr(error, "status_code", None)
+    name = type(error).__name__
+    errors.inc(type=f"{name}_{status_code}" if status_code else name, source=source)
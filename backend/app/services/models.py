@@ -0,0 +1,120 @@
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.config import EMBEDDING_MODEL_NAME, RERANK_ENABLED, RERANK_MODEL_NAME
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+import threading
+import asyncio
+import logging
+import time
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """Loads the embedding model and the LLM client on first use.
+
+    Importing the app never touches torch, sentence-transformers or the
+    OpenAI client, so the server binds right away. The lifespan hook calls
+    ``warm_up`` in the background; requests that arrive before it finishes
+    wait for the same load instead of starting another one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "cold"
+        self.embeddings: Optional[CachedEmbeddings] = None
+        self.embedding_batcher: Optional[EmbeddingBatcher] = None
+        self.embedding_backend: Optional[str] = None
+        self.llm = None
+        self.reranker = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "loaded" and self.embeddings is not None and self.llm is not None
+
+    def load(self) -> None:
+        """Load both models once; later calls return immediately"""
+        with self._lock:
+            if self.state == "loaded":
+                return
+            self.state = "loading"
+            started = time.perf_counter()
+            self._load_embeddings()
+            self._load_llm()
+            if RERANK_ENABLED:
+                self._load_reranker()
+            self.load_seconds = round(time.perf_counter() - started, 2)
+            self.state = "loaded"
+            logger.info(f"Models loaded in {self.load_seconds}s")
+
+    def _load_embeddings(self) -> None:
+        # Chunk embeddings are cached on disk so re-ingesting a transcript only embeds text never seen before
+        try:
+            from app.services.embedding_backends import create_embeddings, embedding_cache_namespace
+            base_embeddings, backend = create_embeddings()
+            # Run one forward pass so the first real request doesn't pay for lazy initialisation
+            base_embeddings.embed_documents(["warm up"])
+            # Ingestion and query embeddings from concurrent requests share forward passes
+            self.embedding_batcher = EmbeddingBatcher(base_embeddings.embed_documents)
+            self.embeddings = CachedEmbeddings(
+                base_embeddings,
+                embedding_cache_namespace(EMBEDDING_MODEL_NAME, backend),
+                EmbeddingCache(),
+                batcher=self.embedding_batcher
+            )
+            self.embedding_backend = backend
+            logger.info(f"Embeddings model loaded successfully ({backend} backend)")
+        except Exception as e:
+            logger.error(f"Failed to load embeddings model: {e}")
+
+    def _load_llm(self) -> None:
+        try:
+            from langchain_openai import ChatOpenAI
+            self.llm = ChatOpenAI(model_name="deepseek/deepseek-chat-v3.2",base_url="https://api.canopywave.io/v1",api_key=os.getenv("OPENAI_API_KEY"))
+            logger.info("ChatOpenAI model initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize ChatOpenAI model: {e}")
+
+    def _load_reranker(self) -> None:
+        # Optional: without it, retrieval keeps a fixed RETRIEVAL_K chunks
+        try:
+            from app.services.rerank import Reranker
+            self.reranker = Reranker(RERANK_MODEL_NAME)
+            logger.info(f"Reranker {RERANK_MODEL_NAME} loaded successfully")
+        except Exception as e:
+            logger.error(f"Failed to load reranker, continuing without reranking: {e}")
+
+    async def ensure_loaded(self) -> None:
+        if self.state != "loaded":
+            await asyncio.to_thread(self.load)
+
+    async def warm_up(self) -> None:
+        logger.info("Warming up models in the background")
+        await self.ensure_loaded()
+
+    async def get_embeddings(self) -> Optional[CachedEmbeddings]:
+        await self.ensure_loaded()
+        return self.embeddings
+
+    async def get_llm(self):
+        await self.ensure_loaded()
+        return self.llm
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "embeddings_loaded": self.embeddings is not None,
+            "embedding_backend": self.embedding_backend,
+            "model_loaded": self.llm is not None,
+            "reranker_loaded": self.reranker is not None,
+            "load_seconds": self.load_seconds
+        }
+
+
+models = ModelLoader()
@@ -2,33 +2,26 @@ from fastapi import HTTPException
 from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound
 from langchain_community.vectorstores import FAISS
 from langchain_core.prompts import PromptTemplate
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from langchain_core.output_parsers import StrOutputParser
+from app.services.models import models
+from app.services.conversation import NO_HISTORY
+from app.services.transcript import fetch_transcript_segments, iter_segment_chunks, CHUNK_SIZE, CHUNK_OVERLAP
+from app.services.lexical import BM25Index, reciprocal_rank_fusion
+from app.services.index_types import compress_index
+from app.services.executor import run_in_embedding_pool
+from app.services.rerank import select_adaptive
+from app.services.metrics import timed, observe_stage
+from app.config import EMBEDDING_BATCH_SIZE, RETRIEVAL_K, RETRIEVAL_MODE, PARTIAL_READY_BATCHES, INDEX_TYPE, RERANK_CANDIDATES, STT_FALLBACK_ENABLED
+from typing import Callable, Optional, Dict, Any, List
+from itertools import islice
+import numpy as np
 import logging
-import os
+import asyncio
+import math
+import time
 
-load_dotenv()
-
-openaiapi = os.getenv("OPENAI_API_KEY")
 logger = logging.getLogger(__name__)
 
-# Initialize embeddings model (load once for efficiency)
-try:
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    logger.info("Embeddings model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load embeddings model: {e}")
-    embeddings = None
-
-# Initialize LLM
-try:
-    model = ChatOpenAI(model_name="deepseek/deepseek-chat-v3.2",base_url="https://api.canopywave.io/v1",api_key=openaiapi)
-    logger.info("ChatOpenAI model initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize ChatOpenAI model: {e}")
-    model = None
-
 # Prompt template
 prompt = PromptTemplate(
     template="""You are a helpful assistant that answers questions based on YouTube video transcripts. 
@@ -39,8 +32,12 @@ prompt = PromptTemplate(
     - If the transcript doesn't contain relevant information, say so clearly
     - Include specific details and examples from the video when possible
     - Be conversational and helpful
-    - If asked about timestamps, mention that you can reference general sections but not exact times
+    - Each transcript excerpt starts with its time range in the video, like [01:05 - 02:10]. When pointing to a part of the video or when asked about timestamps, cite these times
     - Provide Explaination when asked by user
+    - Use the conversation so far to understand follow-up questions like "explain that more"
+    
+    Conversation so far:
+    {history}
     
     Transcript:
     {transcript}
@@ -48,42 +45,292 @@ prompt = PromptTemplate(
     Question: {question}
     
     Answer:""",
-    input_variables=["transcript", "question"]
+    input_variables=["transcript", "question"],
+    # Stateless callers (like multi-video chat) don't pass a history
+    partial_variables={"history": NO_HISTORY}
 )
 
-def extract_transcript(video_id: str) -> str:
-    """Extract transcript from YouTube video"""
+class NoCaptions(HTTPException):
+    """YouTube has no captions for the video"""
+
+
+def extract_transcript(video_id: str) -> List[Dict[str, Any]]:
+    """Extract raw transcript segments from YouTube video"""
     try:
-        from app.services.transcript import fetch_transcript
-        docs = fetch_transcript(video_id)
-        return docs
+        segments = fetch_transcript_segments(video_id)
+        return segments
         
     except TranscriptsDisabled:
         logger.error(f"Transcripts disabled for video {video_id}")
-        raise HTTPException(status_code=400, detail="Transcripts are disabled for this video")
+        raise NoCaptions(status_code=400, detail="Transcripts are disabled for this video")
     except NoTranscriptFound:
         logger.error(f"No transcript found for video {video_id}")
-        raise HTTPException(status_code=404, detail="No transcript found for this video")
+        raise NoCaptions(status_code=404, detail="No transcript found for this video")
     except Exception as e:
         logger.error(f"Error extracting transcript for video {video_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to extract transcript: {str(e)}")
 
-def create_vector_store(docs: str, video_id: str) -> FAISS:
-    """Create FAISS vector store from documents"""
+async def transcribe_or_raise(video_id: str, error: NoCaptions) -> List[Dict[str, Any]]:
+    """Fall back to transcribing the audio, or raise the captions error"""
+    if not STT_FALLBACK_ENABLED:
+        raise error
+    logger.info(f"Transcribing audio for video {video_id} since it has no captions")
+    try:
+        # Imported lazily so the speech pool is only set up when it is used
+        from app.services.speech import transcribe_audio
+        segments = await transcribe_audio(video_id)
+    except ImportError:
+        logger.error("Speech-to-text fallback is enabled but faster-whisper is not installed")
+        raise error
+    except Exception as e:
+        logger.error(f"Error transcribing audio for video {video_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"{error.detail}, and transcribing its audio failed: {str(e)}")
+    if not segments:
+        raise HTTPException(status_code=error.status_code, detail=f"{error.detail}, and no speech was found in its audio")
+    return segments
+
+async def aextract_transcript(video_id: str):
+    """Extract a transcript without blocking the event loop.
+
+    When the video has no captions and ``STT_FALLBACK_ENABLED`` is set, its
+    audio is downloaded and transcribed locally instead.
+    """
+    try:
+        # youtube-transcript-api only offers a blocking client, so run it on a worker thread
+        return await asyncio.to_thread(extract_transcript, video_id)
+    except NoCaptions as e:
+        return await transcribe_or_raise(video_id, e)
+
+async def add_to_vector_store(vector_store: Optional[FAISS], docs, video_id: str) -> FAISS:
+    """Embed a batch of documents and add them to a vector store, creating it if needed"""
     
     try:
+        embeddings = await models.get_embeddings()
         if embeddings is None:
             logger.error("Embeddings model is not loaded")
             raise HTTPException(status_code=500, detail="Embeddings model not available")
-        vector_store = FAISS.from_documents(docs, embedding=embeddings)
-        logger.info(f"Successfully created vector store for video {video_id}")
+
+        texts = [doc.page_content for doc in docs]
+        metadatas = [doc.metadata for doc in docs]
+        # Embedding goes through the shared batcher; the index is only
+        # touched from the event loop so searches never race with adds
+        vectors = await embeddings.aembed_documents(texts)
+        if vector_store is None:
+            return FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas)
+        vector_store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
         return vector_store
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating vector store for video {video_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create vector store: {str(e)}")
 
+async def ingest_video(
+    video_id: str,
+    progress: Optional[Callable[..., None]] = None,
+    on_ready: Optional[Callable[[FAISS, BM25Index, int], None]] = None,
+    index_type: str = INDEX_TYPE
+) -> Dict[str, Any]:
+    """Run the fetch, chunk and embed pipeline for a video.
+
+    Segments are chunked lazily and chunks are embedded and added to the index
+    in fixed-size batches, so memory does not scale with a second full copy of
+    the transcript. A BM25 index over the same chunks is built alongside. ``on_ready`` is called once the first
+    ``PARTIAL_READY_BATCHES`` batches are indexed, letting callers serve chat
+    from the partial index while the rest is embedded.
+
+    Chunks are added to a flat index; once all are in, it is re-encoded as
+    ``index_type`` ("flat", "sq8", "pq", or "auto" to choose by chunk count).
+    """
+    if progress is not None:
+        progress(stage="fetching_transcript")
+    with timed("transcript_fetch"):
+        segments = await aextract_transcript(video_id)
+
+    # Chunk count is only known at the end; estimate it from the text length
+    total_chars = sum(len(segment["text"]) for segment in segments)
+    estimated_total = max(1, math.ceil(total_chars / (CHUNK_SIZE - CHUNK_OVERLAP)))
+    if progress is not None:
+        progress(stage="transcript_fetched", embedded=0, total=estimated_total)
+
+    vector_store = None
+    lexical = BM25Index()
+    embedded = 0
+    batches = 0
+    # Chunking is lazy and interleaved with embedding, so both are summed over the batches
+    chunking_seconds = embedding_seconds = 0.0
+    chunks = iter_segment_chunks(segments)
+    while True:
+        started = time.perf_counter()
+        batch = list(islice(chunks, EMBEDDING_BATCH_SIZE))
+        chunking_seconds += time.perf_counter() - started
+        if not batch:
+            break
+        started = time.perf_counter()
+        vector_store = await add_to_vector_store(vector_store, batch, video_id)
+        embedding_seconds += time.perf_counter() - started
+        lexical.add(doc.page_content for doc in batch)
+        embedded += len(batch)
+        batches += 1
+        if progress is not None:
+            progress(stage="embedding", embedded=embedded, total=max(estimated_total, embedded))
+        if on_ready is not None and batches == PARTIAL_READY_BATCHES:
+            on_ready(vector_store, lexical, embedded)
+
+    observe_stage("chunking", chunking_seconds)
+    observe_stage("embedding", embedding_seconds)
+    if vector_store is None:
+        logger.error(f"Transcript for video {video_id} produced no chunks")
+        raise HTTPException(status_code=500, detail="Failed to create vector store: transcript is empty")
+
+    if progress is not None:
+        progress(stage="compressing_index", total=embedded)
+    # Build the compressed copy off the event loop, then swap it in; the index
+    # is no longer being added to, so partial-index searches can keep reading it
+    with timed("index_build"):
+        vector_store.index = await run_in_embedding_pool(compress_index, vector_store.index, index_type)
+
+    logger.info(f"Successfully created vector store for video {video_id}")
+    return {"vector_store": vector_store, "lexical": lexical, "transcript_length": embedded}
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as mm:ss, or h:mm:ss for long videos"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
 def format_docs(retrieved_docs):
-    """Format retrieved documents for prompt"""
-    context_text = "\n\n".join(doc.page_content for doc in retrieved_docs)
+    """Format retrieved documents for prompt, prefixing each with its time range"""
+    parts = []
+    for doc in retrieved_docs:
+        if "start" in doc.metadata:
+            time_range = f"{format_timestamp(doc.metadata['start'])} - {format_timestamp(doc.metadata['end'])}"
+            parts.append(f"[{time_range}] {doc.page_content}")
+        else:
+            parts.append(doc.page_content)
+    context_text = "\n\n".join(parts)
     return context_text
+
+def doc_sources(retrieved_docs) -> List[Dict[str, Any]]:
+    """Describe retrieved chunks for the API response"""
+    return [
+        {
+            "text": doc.page_content,
+            "start": doc.metadata.get("start"),
+            "end": doc.metadata.get("end")
+        }
+        for doc in retrieved_docs
+    ]
+
+async def embed_query(query: str) -> List[float]:
+    """Embed a chat query as part of the next shared embedding batch"""
+    embeddings = await models.get_embeddings()
+    if embeddings is None:
+        raise HTTPException(status_code=500, detail="Embeddings model not available")
+    return await embeddings.aembed_query(query)
+
+def build_lexical_index(vector_store: FAISS) -> BM25Index:
+    """Rebuild the BM25 index for a vector store, in FAISS position order"""
+    lexical = BM25Index()
+    lexical.add(
+        vector_store.docstore.search(doc_id).page_content
+        for doc_id in (vector_store.index_to_docstore_id[i] for i in range(vector_store.index.ntotal))
+    )
+    return lexical
+
+def vector_positions(vector_store: FAISS, query_vector: List[float], k: int) -> List[int]:
+    """Positions of the k chunks nearest to the query vector, best first"""
+    _, positions = vector_store.index.search(np.array([query_vector], dtype=np.float32), k)
+    return [int(position) for position in positions[0] if position != -1]
+
+def docs_at(vector_store: FAISS, positions: List[int]):
+    """Look up chunk documents by their position in the index"""
+    return [
+        vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+        for position in positions
+    ]
+
+def retrieve_docs(video_data: Dict[str, Any], query: str, query_vector: List[float], mode: Optional[str] = None, k: int = RETRIEVAL_K):
+    """Find the chunks most relevant to a query.
+
+    ``vector`` ranks by embedding similarity, ``lexical`` by BM25, and
+    ``hybrid`` fuses both rankings with reciprocal-rank fusion so exact
+    keyword matches (names, numbers, codes) surface even when the
+    embedding misses them.
+    """
+    mode = mode or RETRIEVAL_MODE
+    if video_data.get("shared"):
+        # The per-video index is gone; fall back to a filtered lookup in the shared index
+        from app.services.shared_index import shared_index
+        results = shared_index.search(query_vector, k, [video_data["video_id"]])
+        return [result["document"] for result in results]
+
+    vector_store = video_data["vector_store"]
+    lexical = video_data.get("lexical")
+    if lexical is None or mode == "vector":
+        return docs_at(vector_store, vector_positions(vector_store, query_vector, k))
+
+    if mode == "lexical":
+        return docs_at(vector_store, [position for position, _ in lexical.search(query, k)])
+
+    # Over-fetch from both retrievers so the fused top k has candidates to choose from
+    fetch_k = k * 4
+    fused = reciprocal_rank_fusion([
+        vector_positions(vector_store, query_vector, fetch_k),
+        [position for position, _ in lexical.search(query, fetch_k)]
+    ])
+    return docs_at(vector_store, fused[:k])
+
+async def retrieve_context(
+    video_data: Dict[str, Any],
+    query: str,
+    query_vector: List[float],
+    mode: Optional[str] = None,
+    timings: Optional[Dict[str, float]] = None
+):
+    """Retrieve the chunks for a prompt, reranking them when a reranker is loaded.
+
+    Without a reranker this is ``retrieve_docs`` with ``RETRIEVAL_K``. With
+    one, ``RERANK_CANDIDATES`` chunks are fetched, rescored by the
+    cross-encoder and cut to an adaptive k. Stage latencies in milliseconds
+    are written to ``timings``.
+    """
+    timings = timings if timings is not None else {}
+    reranker = models.reranker
+    started = time.perf_counter()
+    k = RERANK_CANDIDATES if reranker else RETRIEVAL_K
+    if video_data.get("status") == "partial":
+        # Still being added to from the event loop; searching there too keeps reads and adds apart
+        docs = retrieve_docs(video_data, query, query_vector, mode, k=k)
+    else:
+        # FAISS and BM25 search are CPU-bound, so keep them off the event loop
+        docs = await asyncio.to_thread(retrieve_docs, video_data, query, query_vector, mode, k)
+    timings["retrieval_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if reranker is None:
+        return docs
+
+    started = time.perf_counter()
+    # Cross-encoder inference is CPU-bound like embedding, so it shares that pool
+    scores = await run_in_embedding_pool(reranker.score, query, [doc.page_content for doc in docs])
+    selected = select_adaptive(docs, scores)
+    timings["rerank_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    timings["candidates"] = len(docs)
+    return [doc for doc, _ in selected]
+
+# Answer chain shared by every video; retrieval is done separately so the
+# query embedding can be reused and chunks reported before generation starts
+_answer_chain = None
+
+async def get_answer_chain():
+    """The prompt | LLM | parser chain, built once the LLM has loaded"""
+    global _answer_chain
+    if _answer_chain is None:
+        llm = await models.get_llm()
+        if llm is None:
+            raise HTTPException(status_code=500, detail="Language model not available")
+        _answer_chain = prompt | llm | StrOutputParser()
+    return _answer_chain
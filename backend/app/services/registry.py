@@ -0,0 +1,121 @@
+from app.config import REGISTRY_MAX_BYTES, REGISTRY_IDLE_TTL_SECONDS
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_entry_bytes(entry: Dict[str, Any]) -> int:
+    """Estimate the memory held by a processed video (index vectors, chunk text and BM25 postings)"""
+    vector_store = entry.get("vector_store")
+    if vector_store is None:
+        return 0
+
+    index = vector_store.index
+    # Flat float32 vectors; compressed indexes report their own code size
+    code_size = getattr(index, "code_size", index.d * 4)
+    total = index.ntotal * code_size
+
+    docstore = getattr(vector_store.docstore, "_dict", {})
+    for doc in docstore.values():
+        total += len(doc.page_content.encode("utf-8"))
+
+    lexical = entry.get("lexical")
+    if lexical is not None:
+        total += lexical.estimated_bytes()
+    return total
+
+
+class VideoRegistry:
+    """Bounded in-memory registry of processed videos.
+
+    Entries are evicted least-recently-used first once the estimated byte
+    budget is exceeded, and whenever they have been idle longer than the TTL.
+    Evicted videos stay in the on-disk index cache and are reloaded on demand.
+    """
+
+    def __init__(self, max_bytes: int = REGISTRY_MAX_BYTES, idle_ttl: int = REGISTRY_IDLE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.evictions = {"lru": 0, "ttl": 0}
+
+    def __contains__(self, video_id: str) -> bool:
+        return self.get(video_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return an entry and mark it as recently used"""
+        with self._lock:
+            self.evict_idle()
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            entry["last_used"] = time.monotonic()
+            self._entries.move_to_end(video_id)
+            return entry
+
+    def put(self, video_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.pop(video_id)
+            entry["size_bytes"] = estimate_entry_bytes(entry)
+            entry["last_used"] = time.monotonic()
+            self._entries[video_id] = entry
+            self.total_bytes += entry["size_bytes"]
+            self._evict_over_budget(keep=video_id)
+            return entry
+
+    def pop(self, video_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.pop(video_id, None)
+            if entry is not None:
+                self.total_bytes -= entry["size_bytes"]
+            return entry
+
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            self.evict_idle()
+            return list(self._entries.items())
+
+    def evict_idle(self) -> int:
+        """Drop entries that have not been used within the idle TTL"""
+        if self.idle_ttl <= 0:
+            return 0
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            expired = [vid for vid, e in self._entries.items() if e["last_used"] < cutoff]
+            for video_id in expired:
+                self.pop(video_id)
+                self.evictions["ttl"] += 1
+                logger.info(f"Evicted idle video {video_id} from memory")
+            return len(expired)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        # Never evict the entry just inserted, even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            video_id = next(iter(self._entries))
+            if video_id == keep:
+                break
+            self.pop(video_id)
+            self.evictions["lru"] += 1
+            logger.info(f"Evicted video {video_id} from memory (byte budget exceeded)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_videos": len(self._entries),
+                "memory_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl,
+                "evictions": dict(self.evictions)
+            }
+
+
+processed_videos = VideoRegistry()
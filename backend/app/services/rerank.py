@@ -0,0 +1,45 @@
+from app.config import RERANK_MIN_SCORE, RERANK_MIN_K, RERANK_MAX_K, RERANK_TOKEN_BUDGET
+from app.services.conversation import estimate_tokens
+from typing import Any, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Reranker:
+    """Scores (query, chunk) pairs with a local cross-encoder"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import CrossEncoder
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name)
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        if not texts:
+            return []
+        return [float(score) for score in self.model.predict([(query, text) for text in texts])]
+
+
+def select_adaptive(
+    docs,
+    scores: List[float],
+    min_score: float = RERANK_MIN_SCORE,
+    min_k: int = RERANK_MIN_K,
+    max_k: int = RERANK_MAX_K,
+    token_budget: int = RERANK_TOKEN_BUDGET
+) -> List[Tuple[Any, float]]:
+    """Keep the best-scoring chunks, as many as clear the cutoff and fit the budget.
+
+    At least ``min_k`` chunks are kept even when none clear the cutoff, so
+    the model always has something to ground its answer on.
+    """
+    ranked = sorted(zip(docs, scores), key=lambda item: item[1], reverse=True)
+    selected, used = [], 0
+    for doc, score in ranked:
+        if len(selected) >= max_k:
+            break
+        cost = estimate_tokens(doc.page_content)
+        if len(selected) >= min_k and (score < min_score or used + cost > token_budget):
+            break
+        selected.append((doc, score))
+        used += cost
+    return selected
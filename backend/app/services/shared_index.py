@@ -0,0 +1,143 @@
+from app.config import SHARED_INDEX_HNSW_M, SHARED_INDEX_EF_SEARCH
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import threading
+import logging
+import faiss
+
+logger = logging.getLogger(__name__)
+
+# Filters selecting at most this many chunks are scored exactly instead of
+# through HNSW, whose recall drops when most of the graph is filtered out
+EXACT_SEARCH_LIMIT = 20000
+
+
+class SharedIndex:
+    """One HNSW index over the chunks of every processed video.
+
+    Vectors are L2-normalized and scored by inner product (cosine). Each chunk
+    gets a stable integer id mapped to its video and document, so searches can
+    be restricted to a set of videos with a FAISS ID selector. HNSW cannot
+    delete vectors, so removed videos are tombstoned and the graph is rebuilt
+    once tombstones make up a large share of it.
+    """
+
+    def __init__(self, hnsw_m: int = SHARED_INDEX_HNSW_M, ef_search: int = SHARED_INDEX_EF_SEARCH):
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._chunks: Dict[int, tuple] = {}  # chunk id -> (video_id, document)
+        self._videos: Dict[str, List[int]] = {}  # video_id -> chunk ids
+        self._deleted: set = set()
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def _new_index(self, dim: int) -> faiss.IndexIDMap2:
+        hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efSearch = self.ef_search
+        return faiss.IndexIDMap2(hnsw)
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def has_video(self, video_id: str) -> bool:
+        return video_id in self._videos
+
+    def add_video(self, video_id: str, vector_store) -> None:
+        """Add (or replace) every chunk of a per-video FAISS store"""
+        n = vector_store.index.ntotal
+        if n == 0:
+            return
+        vectors = self._normalize(vector_store.index.reconstruct_n(0, n))
+        docs = [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            for i in range(n)
+        ]
+
+        with self._lock:
+            self.remove_video(video_id)
+            if self._index is None:
+                self._index = self._new_index(vectors.shape[1])
+            ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+            self._next_id += n
+            self._index.add_with_ids(vectors, ids)
+            for chunk_id, doc in zip(ids.tolist(), docs):
+                self._chunks[chunk_id] = (video_id, doc)
+            self._videos[video_id] = ids.tolist()
+        logger.info(f"Added {n} chunks of video {video_id} to the shared index")
+
+    def remove_video(self, video_id: str) -> None:
+        with self._lock:
+            ids = self._videos.pop(video_id, None)
+            if not ids:
+                return
+            for chunk_id in ids:
+                self._chunks.pop(chunk_id, None)
+            self._deleted.update(ids)
+            if len(self._deleted) > 0.3 * self._index.ntotal:
+                self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Drop tombstoned vectors by re-adding the live ones to a fresh graph"""
+        live_ids = np.array(sorted(self._chunks), dtype=np.int64)
+        index = self._new_index(self._index.d)
+        if len(live_ids):
+            index.add_with_ids(self._index.reconstruct_batch(live_ids), live_ids)
+        self._index = index
+        self._deleted.clear()
+        logger.info(f"Rebuilt shared index with {len(live_ids)} chunks")
+
+    def search(self, query_vector, k: int, video_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Return the k best chunks, optionally restricted to some videos"""
+        query = self._normalize([query_vector])
+        with self._lock:
+            if self._index is None or not self._chunks:
+                return []
+
+            if video_ids is not None:
+                ids = np.array(
+                    [chunk_id for video_id in video_ids for chunk_id in self._videos.get(video_id, [])],
+                    dtype=np.int64
+                )
+                if not len(ids):
+                    return []
+                if len(ids) <= EXACT_SEARCH_LIMIT:
+                    scores = self._index.reconstruct_batch(ids) @ query[0]
+                    top = np.argsort(-scores)[:k]
+                    return [self._result(int(ids[i]), float(scores[i])) for i in top]
+                selector = faiss.IDSelectorBatch(ids)
+            elif self._deleted:
+                # Keep a reference to the inner selector; IDSelectorNot does not own it
+                deleted = faiss.IDSelectorBatch(np.array(list(self._deleted), dtype=np.int64))
+                selector = faiss.IDSelectorNot(deleted)
+            else:
+                selector = None
+
+            params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k * 4))
+            if selector is not None:
+                params.sel = selector
+            scores, ids = self._index.search(query, k, params=params)
+
+        return [
+            self._result(int(chunk_id), float(score))
+            for chunk_id, score in zip(ids[0], scores[0])
+            if chunk_id != -1 and int(chunk_id) in self._chunks
+        ]
+
+    def _result(self, chunk_id: int, score: float) -> Dict[str, Any]:
+        video_id, doc = self._chunks[chunk_id]
+        return {"video_id": video_id, "document": doc, "score": score}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "videos": len(self._videos),
+                "chunks": len(self._chunks),
+                "tombstones": len(self._deleted)
+            }
+
+
+shared_index = SharedIndex()
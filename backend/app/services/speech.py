@@ -0,0 +1,173 @@
+from app.config import (
+    STT_MODEL_NAME, STT_COMPUTE_TYPE, STT_WORKERS, STT_CHUNK_SECONDS, STT_AUDIO_DIR
+)
+from app.services.transcript_store import transcript_store, safe_video_id
+from app.services.downloads import download_jobs, run_download
+from app.services.singleflight import SingleFlight
+from app.services.metrics import timed
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import multiprocessing
+import importlib.util
+import threading
+import asyncio
+import shutil
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# Transcripts made from audio are cached under this pseudo-language
+ASR_LANGUAGE = "asr"
+SAMPLE_RATE = 16000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# In-progress transcriptions, keyed by video_id
+transcriptions = SingleFlight()
+
+# Set in each pool process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, compute_type: str, cpu_threads: int) -> None:
+    """Load the speech model once per pool process"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _decode_window(path: str, start: float, seconds: float):
+    """Decode ``seconds`` of audio from ``start`` as 16 kHz mono float32, like faster-whisper's decode_audio"""
+    import numpy as np
+    import av
+
+    arrays = []
+    first_start = None
+    with av.open(path, mode="r", metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        if start > 0:
+            # Lands on a packet at or before start; earlier frames are skipped or trimmed below
+            container.seek(int(start / stream.time_base), stream=stream)
+        for frame in container.decode(stream):
+            frame_start = float(frame.pts * stream.time_base) if frame.pts is not None else start
+            if frame_start >= start + seconds:
+                break
+            if frame_start + frame.samples / frame.sample_rate <= start:
+                continue
+            if first_start is None:
+                first_start = frame_start
+            arrays.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(frame))
+        arrays.extend(resampled.to_ndarray().reshape(-1) for resampled in resampler.resample(None))
+    if not arrays:
+        return np.zeros(0, dtype=np.float32)
+    samples = np.concatenate(arrays).astype(np.float32) / 32768.0
+    skip = max(0, int(round((start - first_start) * SAMPLE_RATE)))
+    return samples[skip:skip + int(seconds * SAMPLE_RATE)]
+
+
+def _transcribe_window(path: str, start: float, seconds: float) -> List[Dict[str, Any]]:
+    """Decode and transcribe one window of the audio file, with timestamps relative to the video"""
+    samples = _decode_window(path, start, seconds)
+    if not len(samples):
+        return []
+    segments, _ = _worker_model.transcribe(samples, vad_filter=True)
+    return [
+        {"text": segment.text.strip(), "start": round(start + segment.start, 2), "duration": round(segment.end - segment.start, 2)}
+        for segment in segments
+        if segment.text.strip()
+    ]
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """Length of an audio file in seconds from its container metadata, or None if unknown"""
+    import av
+
+    with av.open(path, mode="r", metadata_errors="ignore") as container:
+        if container.duration:
+            return container.duration / av.time_base
+        stream = container.streams.audio[0]
+        if stream.duration and stream.time_base:
+            return float(stream.duration * stream.time_base)
+    return None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: the server process runs threads (FAISS, the event loop)
+            # that must not be duplicated mid-operation into the children
+            _pool = ProcessPoolExecutor(
+                max_workers=STT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(STT_MODEL_NAME, STT_COMPUTE_TYPE, max(1, (os.cpu_count() or 1) // STT_WORKERS))
+            )
+        return _pool
+
+
+async def download_audio_file(video_id: str, output_path: str) -> str:
+    """Download a video's audio through the download engine, sharing a download already in flight"""
+    job = download_jobs.submit(
+        video_id,
+        # No MP3 transcode: the audio is decoded straight away, from any format
+        lambda job: run_download(job, video_id, "audio", output_path, convert=False),
+        key=f"{video_id}:audio:{output_path}"
+    )
+    await download_jobs.wait(job)
+    if job.status != "completed":
+        raise RuntimeError(f"Audio download failed: {job.error}")
+    return job.result["file_path"]
+
+
+async def transcribe_audio(video_id: str, chunk_seconds: int = STT_CHUNK_SECONDS) -> List[Dict[str, Any]]:
+    """Transcribe a video's audio track into timestamped segments, once per video.
+
+    Concurrent calls for a video share one transcription. The audio file is
+    split into fixed-length windows and each pool process decodes and
+    transcribes its own window, so the server process never holds the
+    decoded audio. The segments are cached in the transcript store and the
+    audio file is removed afterwards.
+    """
+    # faster-whisper is an optional dependency, only imported in the pool processes
+    if importlib.util.find_spec("faster_whisper") is None:
+        raise ImportError("faster-whisper is not installed")
+    return await transcriptions.do(video_id, lambda: _transcribe(video_id, chunk_seconds))
+
+
+async def _transcribe(video_id: str, chunk_seconds: int) -> List[Dict[str, Any]]:
+    cached = await asyncio.to_thread(transcript_store.get, video_id, [ASR_LANGUAGE])
+    if cached is not None:
+        logger.info(f"Using cached audio transcript for video {video_id}")
+        return cached["segments"]
+
+    audio_dir = os.path.join(STT_AUDIO_DIR, safe_video_id(video_id))
+    try:
+        audio_path = await download_audio_file(video_id, audio_dir)
+        duration = await asyncio.to_thread(audio_duration, audio_path)
+        if duration is None:
+            # Without a known length the whole file becomes one window
+            logger.warning(f"Unknown audio length for video {video_id}; transcribing it as one chunk")
+            windows = [(0.0, float("inf"))]
+        else:
+            windows = [(float(start), float(chunk_seconds)) for start in range(0, math.ceil(duration), chunk_seconds)]
+        logger.info(f"Transcribing {duration or 0:.0f}s of audio for video {video_id} in {len(windows)} chunks")
+
+        with timed("audio_transcription"):
+            loop = asyncio.get_running_loop()
+            pool = get_pool()
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, _transcribe_window, audio_path, start, seconds)
+                for start, seconds in windows
+            ])
+    finally:
+        await asyncio.to_thread(shutil.rmtree, audio_dir, True)
+    segments = [segment for window in results for segment in window]
+
+    await asyncio.to_thread(transcript_store.put, video_id, ASR_LANGUAGE, segments, source="faster-whisper", model=STT_MODEL_NAME)
+    logger.info(f"Transcribed video {video_id} into {len(segments)} segments")
+    return segments
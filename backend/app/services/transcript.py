@@ -1,37 +1,126 @@
 from youtube_transcript_api import YouTubeTranscriptApi
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.services.transcript_store import transcript_store
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from collections import deque
+import logging
 
+logger = logging.getLogger(__name__)
 
-def text_splitter(docs):
+TRANSCRIPT_LANGUAGES = ["en", "hi", "bn", "zh"]
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
 
-    splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-            )
-            
-    chunks = splitter.split_text(docs)
 
-    preprocessed_docs = []
-    for chunk in chunks:
-        preprocessed_docs.append(Document(page_content=chunk, metadata={}))
-    return preprocessed_docs
+def split_segment(text: str, start: float, end: float, size: int) -> Iterator[Tuple[str, float, float]]:
+    """Split a segment longer than ``size`` on word boundaries, sharing out its time range by length"""
+    if len(text) <= size:
+        yield text, start, end
+        return
+    pieces = []
+    piece = ""
+    for word in text.split(" "):
+        # A single word longer than size is cut wherever it has to be
+        while len(word) > size:
+            if piece:
+                pieces.append(piece)
+                piece = ""
+            pieces.append(word[:size])
+            word = word[size:]
+        if piece and len(piece) + 1 + len(word) > size:
+            pieces.append(piece)
+            piece = ""
+        piece = f"{piece} {word}" if piece else word
+    if piece:
+        pieces.append(piece)
 
+    per_char = (end - start) / len(text)
+    offset = 0
+    for piece in pieces:
+        piece_start = start + offset * per_char
+        offset += len(piece) + 1
+        yield piece, piece_start, min(end, start + offset * per_char)
 
-        
 
-def fetch_transcript(video_id: str):
+def iter_segment_chunks(
+    segments: Iterable[Dict[str, Any]],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP
+) -> Iterator[Document]:
+    """Group transcript segments into overlapping chunks that carry their time range.
 
-    yt_transcript = YouTubeTranscriptApi()
-    transcript_list = yt_transcript.fetch(video_id=video_id, languages=["en", "hi","bn","zh"])
+    Chunks are built in one pass over the segments and always break on segment
+    boundaries, so every chunk knows the start and end second it covers. A
+    segment longer than ``chunk_size`` is first split into pieces that fit.
+    Chunks are yielded as soon as they are complete, so very long transcripts
+    can be embedded while later segments are still being chunked.
+    """
+    chunk_index = 0
+    window = deque()  # (text, start, end) of the segments in the current chunk
+    length = 0
+    pending = False  # whether the window holds text not yet emitted in a chunk
 
-    items = []
+    def make_chunk():
+        return Document(
+            page_content=" ".join(text for text, _, _ in window),
+            metadata={
+                "start": window[0][1],
+                "end": window[-1][2],
+                "chunk_index": chunk_index
+            }
+        )
+
+    for segment in segments:
+        # Clean up transcript text
+        text = segment["text"].replace("\n", " ").strip()
+        if not text:  # Only add non-empty text
+            continue
+
+        start = float(segment.get("start", 0.0))
+        end = start + float(segment.get("duration", 0.0))
+        for piece, piece_start, piece_end in split_segment(text, start, end, chunk_size):
+            if pending and length + len(piece) > chunk_size:
+                yield make_chunk()
+                chunk_index += 1
+                pending = False
+                # Carry trailing segments over as the overlap for the next chunk,
+                # dropping any that would push that chunk past chunk_size
+                while window and (length > chunk_overlap or length + len(piece) > chunk_size):
+                    length -= len(window.popleft()[0]) + 1
+
+            window.append((piece, piece_start, piece_end))
+            length += len(piece) + 1
+            pending = True
+
+    if pending:
+        yield make_chunk()
+
+
+def fetch_transcript_segments(video_id: str, languages: List[str] = TRANSCRIPT_LANGUAGES) -> List[Dict[str, Any]]:
+    """Return raw transcript segments, using the local store before the network"""
+    cached = transcript_store.get(video_id, languages)
+    if cached is not None and cached["fresh"]:
+        logger.info(f"Using cached transcript for video {video_id} ({cached['language']})")
+        return cached["segments"]
+
+    try:
+        yt_transcript = YouTubeTranscriptApi()
+        transcript_list = yt_transcript.fetch(video_id=video_id, languages=languages)
+    except Exception as e:
+        # A stale copy beats failing outright, e.g. when YouTube rate-limits us
+        if cached is not None:
+            logger.warning(f"Refreshing transcript for video {video_id} failed ({e}); using stale copy")
+            return cached["segments"]
+        raise
+
+    segments = []
     for transcript in transcript_list:
-            # Clean up transcript text
-        text = transcript.text.replace("\n", " ").strip()
-        if text:  # Only add non-empty text
-            items.append(text)
-
-    docs = " ".join(items)
-    chunked_data = text_splitter(docs)
-    return chunked_data
+        segments.append({
+            "text": transcript.text,
+            "start": transcript.start,
+            "duration": transcript.duration
+        })
+
+    language = getattr(transcript_list, "language_code", languages[0])
+    transcript_store.put(video_id, language, segments)
+    return segments
@@ -0,0 +1,79 @@
+from app.config import TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_TTL_SECONDS
+from typing import Any, Dict, List, Optional
+import logging
+import gzip
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def safe_video_id(video_id: str) -> str:
+    """A video ID reduced to characters that are safe in file names"""
+    # Video IDs are URL-safe base64, but never trust them as paths
+    safe_id = "".join(c for c in video_id if c.isalnum() or c in "-_")
+    if not safe_id:
+        raise ValueError(f"Invalid video ID: {video_id!r}")
+    return safe_id
+
+
+class TranscriptStore:
+    """Gzipped on-disk store of raw transcript segments keyed by video_id and language.
+
+    Each record keeps every segment's ``text``, ``start`` and ``duration`` so
+    later stages can build timestamped chunks without fetching again.
+    """
+
+    def __init__(self, root: str = TRANSCRIPT_CACHE_DIR, ttl: int = TRANSCRIPT_CACHE_TTL_SECONDS):
+        self.root = root
+        self.ttl = ttl
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, video_id: str, language: str) -> str:
+        safe_id = safe_video_id(video_id)
+        safe_lang = "".join(c for c in language if c.isalnum() or c in "-_")
+        return os.path.join(self.root, f"{safe_id}.{safe_lang}.json.gz")
+
+    def get(self, video_id: str, languages: List[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached record for the first available language, or None.
+
+        The record's ``fresh`` flag is False once it is older than the TTL; the
+        caller should refetch but may fall back to the stale copy on failure.
+        """
+        for language in languages:
+            path = self._path(video_id, language)
+            if not os.path.exists(path):
+                continue
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Discarding unreadable cached transcript {path}: {e}")
+                os.remove(path)
+                continue
+            record["fresh"] = time.time() - record.get("fetched_at", 0) < self.ttl
+            return record
+        return None
+
+    def put(self, video_id: str, language: str, segments: List[Dict[str, Any]], **extra: Any) -> None:
+        path = self._path(video_id, language)
+        record = {
+            "video_id": video_id,
+            "language": language,
+            "fetched_at": time.time(),
+            "segments": segments,
+            **extra
+        }
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to cache transcript for video {video_id}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+transcript_store = TranscriptStore()
@@ -0,0 +1,135 @@
+from app.config import VIDEO_STATE_PATH, BUILD_LEASE_SECONDS
+from typing import Any, Dict, Optional
+import threading
+import json
+import logging
+import sqlite3
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Finished job snapshots are kept this long for polling from other workers
+JOB_SNAPSHOT_TTL_SECONDS = 24 * 3600
+
+
+class VideoStateStore:
+    """SQLite record of which videos are ready or being built, shared by all workers.
+
+    Indexes themselves live in the on-disk index cache; this table only
+    coordinates workers so each video is built once per box. It also keeps
+    snapshots of ingestion jobs so any worker can answer a job poll. A worker that
+    wants to build a video claims it first. A claim held by a dead process,
+    or not renewed within the lease, is treated as abandoned and can be
+    taken over; the building worker renews it while the build runs.
+    """
+
+    def __init__(self, path: str = VIDEO_STATE_PATH, lease_seconds: int = BUILD_LEASE_SECONDS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            "video_id TEXT PRIMARY KEY, status TEXT NOT NULL, pid INTEGER, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _set(self, video_id: str, status: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, status, pid, updated_at) VALUES (?, ?, ?, ?)",
+                (video_id, status, os.getpid(), time.time())
+            )
+
+    def claim_build(self, video_id: str) -> bool:
+        """Claim the right to build a video; False if another live worker holds it"""
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock so two workers can't both claim
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT status, pid, updated_at FROM videos WHERE video_id = ?", (video_id,)
+                ).fetchone()
+                if row is not None and row[0] == "building" and row[1] != os.getpid():
+                    _, pid, updated_at = row
+                    if _pid_alive(pid) and time.time() - updated_at < self.lease_seconds:
+                        self._conn.execute("COMMIT")
+                        return False
+                    logger.warning(f"Taking over abandoned build of video {video_id} from pid {pid}")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO videos (video_id, status, pid, updated_at) VALUES (?, 'building', ?, ?)",
+                    (video_id, os.getpid(), time.time())
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def renew_build(self, video_id: str) -> bool:
+        """Extend this worker's build lease; False if the claim was lost"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE videos SET updated_at = ? WHERE video_id = ? AND status = 'building' AND pid = ?",
+                (time.time(), video_id, os.getpid())
+            )
+        return cursor.rowcount > 0
+
+    def mark_ready(self, video_id: str) -> None:
+        self._set(video_id, "ready")
+
+    def mark_deleted(self, video_id: str) -> None:
+        self._set(video_id, "deleted")
+
+    def release(self, video_id: str) -> None:
+        """Drop this worker's claim on a build that failed or was cancelled"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM videos WHERE video_id = ? AND status = 'building' AND pid = ?",
+                (video_id, os.getpid())
+            )
+
+    def status(self, video_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_job(self, job: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, data, updated_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(job), now)
+            )
+            if job["status"] in ("completed", "failed"):
+                self._conn.execute("DELETE FROM jobs WHERE updated_at < ?", (now - JOB_SNAPSHOT_TTL_SECONDS,))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM videos GROUP BY status").fetchall()
+        return dict(rows)
+
+
+video_states = VideoStateStore()
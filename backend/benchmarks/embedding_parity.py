@@ -0,0 +1,107 @@
+"""Parity and throughput of an embedding backend against the PyTorch model.
+
+Run from the backend directory:
+
+    python -m benchmarks.embedding_parity --backend onnx-int8
+
+The same check runs under pytest in ``tests/test_embedding_parity.py``;
+this script adds throughput numbers and larger samples.
+
+Embeds transcript-like chunks with both backends and checks that every
+vector stays within the cosine tolerance of its PyTorch counterpart and
+that top-k retrieval over the chunks is unchanged. Exits non-zero when the
+backend falls outside tolerance, so it can gate a deployment.
+"""
+from app.services.embedding_backends import EMBEDDING_BACKENDS, create_embeddings
+from app.config import EMBEDDING_MODEL_NAME
+import numpy as np
+import argparse
+import time
+import sys
+
+# Minimum cosine similarity to the PyTorch vector for each backend
+TOLERANCES = {"torch": 0.9999, "onnx": 0.9999, "onnx-int8": 0.98}
+# Minimum share of the PyTorch top-k results each backend must also return
+TOP_K_AGREEMENT = {"torch": 1.0, "onnx": 1.0, "onnx-int8": 0.9}
+
+WORDS = (
+    "today we are going to look at how the new graphics card performs in games "
+    "compared to last year model the price went up but so did the memory and "
+    "power draw let me show you the benchmark results and talk about whether "
+    "it is worth upgrading from an older card for most people"
+).split()
+
+
+def sample_texts(n: int, words_per_text: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(WORDS, words_per_text)) for _ in range(n)]
+
+
+def embed(embeddings, texts, batch_size: int):
+    started = time.perf_counter()
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + batch_size]))
+    elapsed = time.perf_counter() - started
+    vectors = np.array(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), elapsed
+
+
+def top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+def compare(expected: np.ndarray, actual: np.ndarray, k: int):
+    """Per-text cosine similarity, and the mean top-k overlap over the first 64 texts as queries"""
+    cosine = np.sum(expected * actual, axis=1)
+    queries = expected[: min(64, len(expected))]
+    expected_top = top_k(expected, queries, k)
+    actual_top = top_k(actual, queries, k)
+    overlap = np.mean([len(set(e) & set(a)) / k for e, a in zip(expected_top, actual_top)])
+    return cosine, overlap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default="onnx")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--words", type=int, default=150, help="words per text, ~1000 characters")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--tolerance", type=float, help="minimum cosine similarity to torch")
+    args = parser.parse_args()
+    tolerance = args.tolerance if args.tolerance is not None else TOLERANCES[args.backend]
+
+    texts = sample_texts(args.texts, args.words)
+    reference, _ = create_embeddings("torch", args.model)
+    candidate, loaded = create_embeddings(args.backend, args.model)
+    if loaded != args.backend:
+        print(f"{args.backend} backend could not be loaded (is optimum[onnxruntime] installed?)")
+        sys.exit(2)
+
+    # Warm both models up so one-off graph setup doesn't count towards throughput
+    reference.embed_documents(texts[:args.batch_size])
+    candidate.embed_documents(texts[:args.batch_size])
+    expected, torch_s = embed(reference, texts, args.batch_size)
+    actual, backend_s = embed(candidate, texts, args.batch_size)
+
+    cosine, overlap = compare(expected, actual, args.k)
+
+    print(f"{args.texts} texts of {args.words} words, batch size {args.batch_size}")
+    print(f"torch:          {args.texts / torch_s:8.1f} texts/s")
+    print(f"{args.backend + ':':<15} {args.texts / backend_s:8.1f} texts/s ({torch_s / backend_s:.2f}x)")
+    print(f"cosine to torch: min {cosine.min():.5f}, mean {cosine.mean():.5f} (tolerance {tolerance})")
+    print(f"top-{args.k} overlap with torch: {overlap:.3f} (minimum {TOP_K_AGREEMENT[args.backend]})")
+
+    if cosine.min() < tolerance:
+        print("FAIL: embeddings outside tolerance")
+        sys.exit(1)
+    if overlap < TOP_K_AGREEMENT[args.backend]:
+        print("FAIL: top-k results differ from torch")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
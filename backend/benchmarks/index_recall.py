@@ -0,0 +1,84 @@
+"""Recall and memory of compressed FAISS index types against the flat index.
+
+Run from the backend directory:
+
+    python -m benchmarks.index_recall --chunks 5000 20000 50000
+
+Vectors are synthetic and clustered to resemble sentence embeddings (384
+dimensions like all-MiniLM-L6-v2). Pass ``--real`` to embed random
+sentences with the configured embedding model instead.
+"""
+from app.services.index_types import build_index, choose_index_type, PQ_MIN_TRAINING_VECTORS
+import numpy as np
+import argparse
+import time
+
+DIM = 384
+
+
+def synthetic_vectors(n: int, dim: int = DIM, rank: int = 64, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    # Sentence embeddings occupy a low-dimensional subspace; isotropic noise
+    # in all 384 dimensions would make every index type look worse than it is
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim)).astype(np.float32)
+    centers = rng.standard_normal((clusters, rank)).astype(np.float32)
+    latent = centers[rng.integers(0, clusters, n)] + 0.7 * rng.standard_normal((n, rank)).astype(np.float32)
+    vectors = latent @ basis + 0.1 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def real_vectors(n: int) -> np.ndarray:
+    from app.services.embedding_backends import create_embeddings
+    embeddings, _ = create_embeddings()
+    rng = np.random.default_rng(0)
+    words = "video model data people time really going think know talk example first".split()
+    texts = [" ".join(rng.choice(words, 40)) for _ in range(n)]
+    return np.array(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray, k: int) -> float:
+    hits = sum(len(set(t[:k]) & set(f[:k])) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def run(n_chunks: int, n_queries: int, k: int, real: bool) -> None:
+    vectors = real_vectors(n_chunks + n_queries) if real else synthetic_vectors(n_chunks + n_queries)
+    corpus, queries = vectors[:n_chunks], vectors[n_chunks:]
+
+    flat = build_index(corpus, "flat")
+    _, truth = flat.search(queries, k)
+
+    print(f"\n{n_chunks} chunks, {n_queries} queries, recall@{k} (auto picks {choose_index_type(n_chunks, 'auto')})")
+    print(f"{'type':<6} {'recall':>8} {'bytes/vec':>10} {'index MB':>9} {'build s':>8} {'query ms':>9}")
+    for index_type in ("flat", "sq8", "pq"):
+        if index_type == "pq" and n_chunks < PQ_MIN_TRAINING_VECTORS:
+            # Production falls back to sq8 here; an under-trained PQ index isn't worth measuring
+            print(f"{index_type:<6} skipped: needs {PQ_MIN_TRAINING_VECTORS} chunks to train")
+            continue
+        started = time.perf_counter()
+        index = build_index(corpus, index_type)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, found = index.search(queries, k)
+        query_ms = (time.perf_counter() - started) * 1000 / n_queries
+
+        print(
+            f"{index_type:<6} {recall_at_k(truth, found, k):>8.3f} {index.code_size:>10} "
+            f"{index.code_size * index.ntotal / 1024 ** 2:>9.1f} {build_s:>8.2f} {query_ms:>9.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2000, 12000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--real", action="store_true", help="embed sentences with the real model")
+    args = parser.parse_args()
+    for n_chunks in args.chunks:
+        run(n_chunks, args.queries, args.k, args.real)
+
+
+if __name__ == "__main__":
+    main()
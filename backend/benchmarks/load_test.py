@@ -0,0 +1,295 @@
+"""Offline load test: ingestion throughput, chat latency and peak memory.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --minutes 10 60 600 --clients 8 --requests 20
+
+YouTube and the remote LLM are replaced by local stand-ins so results are
+reproducible without network access. Transcripts are synthetic, with
+``--minutes`` of speech per video, and the LLM answers after
+``--llm-latency-ms`` at ``--tokens-per-second``. Embeddings are
+deterministic random vectors unless ``--real-embeddings`` loads the
+configured model (it must already be downloaded).
+
+The app from ``create_app()`` is driven in-process through httpx, by
+``--clients`` concurrent clients each sending ``--requests`` chats. Pass
+``--max-p99-ms`` to fail the run when chat p99 latency exceeds a limit.
+"""
+import tempfile
+import os
+
+# Keep caches out of the working tree and skip the background model load;
+# both are read when the app is imported
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="ytrag-bench-")
+os.environ["MODEL_WARMUP_ENABLED"] = "false"
+# Every simulated client shares one address, so per-client rate limits are
+# off unless set explicitly; admission queues stay as configured
+os.environ.setdefault("CHAT_RATE_PER_MINUTE", "0")
+os.environ.setdefault("INGEST_RATE_PER_MINUTE", "0")
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.services.models import models
+from app.services import rag
+from app import create_app
+import numpy as np
+import statistics
+import argparse
+import resource
+import hashlib
+import asyncio
+import httpx
+import json
+import time
+import sys
+
+DIM = 384
+SEGMENT_SECONDS = 3.0
+WORDS = (
+    "the video model data people time really going think know talk example first "
+    "network training layer memory latency cache index query answer question "
+    "python server request stream token budget chunk vector search result"
+).split()
+
+
+def synthetic_segments(video_id: str, minutes: float, words_per_segment: int = 8):
+    """About 160 spoken words per minute, in caption-sized segments"""
+    rng = np.random.default_rng(int(hashlib.md5(video_id.encode()).hexdigest()[:8], 16))
+    count = int(minutes * 60 / SEGMENT_SECONDS)
+    return [
+        {"text": " ".join(rng.choice(WORDS, words_per_segment)), "start": i * SEGMENT_SECONDS, "duration": SEGMENT_SECONDS}
+        for i in range(count)
+    ]
+
+
+class SyntheticEmbeddings(Embeddings):
+    """Deterministic unit vectors derived from a hash of the text"""
+
+    def _vector(self, text: str):
+        rng = np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16))
+        vector = rng.standard_normal(DIM)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+class SyntheticChatModel(BaseChatModel):
+    """Answers after a fixed latency, then emits tokens at a fixed rate"""
+
+    latency_ms: float = 500.0
+    tokens_per_second: float = 50.0
+    answer_tokens: int = 100
+
+    @property
+    def _llm_type(self) -> str:
+        return "synthetic"
+
+    def _tokens(self):
+        return [f"{WORDS[i % len(WORDS)]} " for i in range(self.answer_tokens)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_ms / 1000 + self.answer_tokens / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self._tokens())))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000 + self.answer_tokens / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self._tokens())))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_ms / 1000)
+        for token in self._tokens():
+            await asyncio.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+# Transcript length of each benchmark video, read by the stand-in provider
+transcript_minutes = {}
+
+
+def fetch_transcript_segments(video_id: str, languages=None):
+    return synthetic_segments(video_id, transcript_minutes[video_id])
+
+
+def install_stand_ins(args) -> None:
+    """Swap the transcript provider and models for the local stand-ins"""
+    rag.fetch_transcript_segments = fetch_transcript_segments
+
+    if args.real_embeddings:
+        models._load_embeddings()
+        if models.embeddings is None:
+            sys.exit("Could not load the embedding model; run without --real-embeddings")
+    else:
+        base = SyntheticEmbeddings()
+        models.embedding_batcher = EmbeddingBatcher(base.embed_documents)
+        models.embeddings = CachedEmbeddings(base, "synthetic", EmbeddingCache(), batcher=models.embedding_batcher)
+    models.llm = SyntheticChatModel(
+        latency_ms=args.llm_latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens
+    )
+    models.state = "loaded"
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def ingest(client: httpx.AsyncClient, video_id: str):
+    """Ingest a video as a background job, returning (seconds, chunks) once fully indexed.
+
+    A synchronous /process_video returns as soon as the first batches are
+    chat-ready, which would understate the cost of long transcripts.
+    """
+    started = time.perf_counter()
+    response = await client.post("/process_video", json={"video_id": video_id, "background": True})
+    if response.status_code != 200:
+        raise RuntimeError(f"Ingesting {video_id} failed: {response.status_code} {response.text}")
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] == "failed":
+            raise RuntimeError(f"Ingesting {video_id} failed: {job['error']}")
+        if job["status"] == "completed":
+            return time.perf_counter() - started, job["progress"].get("embedded")
+        await asyncio.sleep(0.01)
+
+
+async def chat_client(client: httpx.AsyncClient, client_id: int, video_ids, requests: int, stream: bool):
+    """Send chats one after another, returning (latency, time to first token, ok) per chat.
+
+    httpx's ASGI transport delivers a streamed body all at once, so time to
+    first token is the server's own ``ttft_ms`` timing rather than measured here.
+    """
+    results = []
+    for i in range(requests):
+        # Distinct questions so the answer cache doesn't short-circuit the run
+        body = {"video_id": video_ids[i % len(video_ids)], "query": f"client {client_id} question {i} about {WORDS[i % len(WORDS)]}"}
+        started = time.perf_counter()
+        timings = {}
+        try:
+            if stream:
+                async with client.stream("POST", "/chat/stream", json=body) as response:
+                    ok = response.status_code == 200
+                    event = None
+                    async for line in response.aiter_lines():
+                        if line.startswith("event: "):
+                            event = line[len("event: "):]
+                            ok = ok and event != "error"
+                        elif line.startswith("data: ") and event == "done":
+                            timings = json.loads(line[len("data: "):]).get("timings", {})
+            else:
+                response = await client.post("/chat", json=body)
+                ok = response.status_code == 200
+                timings = response.json().get("timings", {}) if ok else {}
+        except httpx.HTTPError:
+            ok = False
+        results.append((time.perf_counter() - started, timings.get("ttft_ms"), ok))
+    return results
+
+
+async def run(args):
+    install_stand_ins(args)
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    report = {"config": vars(args)}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        video_ids = []
+        ingestion = []
+        for minutes in args.minutes:
+            video_id = f"bench{len(video_ids):03d}"
+            transcript_minutes[video_id] = minutes
+            seconds, chunks = await ingest(client, video_id)
+            video_ids.append(video_id)
+            ingestion.append({
+                "video_id": video_id,
+                "transcript_minutes": minutes,
+                "chunks": chunks,
+                "seconds": round(seconds, 3),
+                # Transcript minutes indexed per wall-clock second
+                "minutes_per_second": round(minutes / seconds, 1)
+            })
+        report["ingestion"] = ingestion
+
+        started = time.perf_counter()
+        per_client = await asyncio.gather(*[
+            chat_client(client, client_id, video_ids, args.requests, args.stream)
+            for client_id in range(args.clients)
+        ])
+        wall = time.perf_counter() - started
+
+    results = [result for client_results in per_client for result in client_results]
+    latencies = [latency * 1000 for latency, _, ok in results if ok]
+    first_tokens = [first for _, first, ok in results if ok and first is not None]
+    report["chat"] = {
+        "requests": len(results),
+        "errors": sum(1 for _, _, ok in results if not ok),
+        "throughput_rps": round(len(results) / wall, 2),
+        "p50_ms": round(percentile(latencies, 0.5), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 1) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies), 1) if latencies else None
+    }
+    if first_tokens:
+        report["chat"]["ttft_p50_ms"] = round(percentile(first_tokens, 0.5), 1)
+        report["chat"]["ttft_p99_ms"] = round(percentile(first_tokens, 0.99), 1)
+    report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return report
+
+
+def print_report(report) -> None:
+    print("ingestion")
+    for row in report["ingestion"]:
+        print(
+            f"  {row['video_id']}  {row['transcript_minutes']:7.0f} min  {row['chunks'] or '?':>6} chunks  "
+            f"{row['seconds']:8.2f}s  {row['minutes_per_second']:8.1f} transcript min/s"
+        )
+    chat = report["chat"]
+    print(f"chat ({chat['requests']} requests, {chat['errors']} errors, {chat['throughput_rps']} req/s)")
+    print(f"  latency  p50 {chat['p50_ms']} ms  p99 {chat['p99_ms']} ms  mean {chat['mean_ms']} ms")
+    if "ttft_p50_ms" in chat:
+        print(f"  first token  p50 {chat['ttft_p50_ms']} ms  p99 {chat['ttft_p99_ms']} ms")
+    print(f"peak RSS {report['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60], help="transcript length of each video")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="chats per client")
+    parser.add_argument("--stream", action="store_true", help="use /chat/stream instead of /chat")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--answer-tokens", type=int, default=50)
+    parser.add_argument("--real-embeddings", action="store_true")
+    parser.add_argument("--max-p99-ms", type=float, help="exit with status 1 if chat p99 latency is higher")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    chat = report["chat"]
+    if chat["errors"] or (args.max_p99_ms is not None and (chat["p99_ms"] is None or chat["p99_ms"] > args.max_p99_ms)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Startup time: app import, time to first response and time to ready.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 3
+
+Each run starts a fresh ``uvicorn main:app`` process and polls
+``/health/live`` (the server is accepting requests) and ``/health/ready``
+(models are warmed up). Import time is measured in its own interpreter.
+"""
+import urllib.request
+import urllib.error
+import subprocess
+import statistics
+import argparse
+import socket
+import time
+import sys
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_seconds(module: str) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for(url: str, started: float, timeout: float):
+    """Seconds from ``started`` until ``url`` returns 200, or None on timeout"""
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def server_run(timeout: float):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        live = wait_for(f"{base}/health/live", started, timeout)
+        ready = wait_for(f"{base}/health/ready", started, timeout) if live is not None else None
+    finally:
+        server.terminate()
+        server.wait()
+    return live, ready
+
+
+def summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return "timed out"
+    return f"median {statistics.median(values):6.2f}s  min {min(values):6.2f}s  max {max(values):6.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    imports = [import_seconds("main") for _ in range(args.runs)]
+    runs = [server_run(args.timeout) for _ in range(args.runs)]
+
+    print(f"import main:         {summary(imports)}")
+    print(f"first response:      {summary([live for live, _ in runs])}")
+    print(f"ready (models warm): {summary([ready for _, ready in runs])}")
+
+
+if __name__ == "__main__":
+    main()
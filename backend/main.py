@@ -1,7 +1,12 @@
 import uvicorn
 from app import create_app
+from app.config import WORKERS
 
 app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    if WORKERS > 1:
+        # Each worker is a separate process, so uvicorn needs the app as an import string
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
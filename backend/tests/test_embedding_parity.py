@@ -0,0 +1,40 @@
+"""ONNX embedding backends must match the PyTorch model closely enough to share indexes"""
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("optimum.onnxruntime")
+
+from app.services.embedding_backends import create_embeddings
+from benchmarks.embedding_parity import TOLERANCES, TOP_K_AGREEMENT, sample_texts, embed, compare
+
+TEXTS = 64
+WORDS_PER_TEXT = 150
+K = 4
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return sample_texts(TEXTS, WORDS_PER_TEXT)
+
+
+@pytest.fixture(scope="module")
+def reference(texts):
+    try:
+        embeddings, _ = create_embeddings("torch")
+    except Exception as e:
+        pytest.skip(f"Embedding model not available: {e}")
+    vectors, _ = embed(embeddings, texts, batch_size=32)
+    return vectors
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_backend_matches_torch(backend, texts, reference):
+    embeddings, loaded = create_embeddings(backend)
+    if loaded != backend:
+        pytest.skip(f"{backend} backend could not be loaded")
+    vectors, _ = embed(embeddings, texts, batch_size=32)
+
+    cosine, overlap = compare(reference, vectors, K)
+
+    assert cosine.min() >= TOLERANCES[backend]
+    assert overlap >= TOP_K_AGREEMENT[backend]
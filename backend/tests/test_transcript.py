@@ -0,0 +1,49 @@
+from app.services.transcript import iter_segment_chunks, split_segment, CHUNK_SIZE, CHUNK_OVERLAP
+
+
+def segment(text, start, duration=1.0):
+    return {"text": text, "start": start, "duration": duration}
+
+
+def test_short_window_before_long_segment_is_not_repeated():
+    short = "a" * 99
+    long = " ".join(["word"] * 190)  # 949 characters
+    chunks = list(iter_segment_chunks([segment(short, 0.0), segment(long, 1.0, 10.0)]))
+
+    assert [chunk.page_content for chunk in chunks] == [short, long]
+    assert [chunk.metadata["chunk_index"] for chunk in chunks] == [0, 1]
+    assert chunks[1].metadata["start"] == 1.0
+
+
+def test_segment_longer_than_chunk_size_is_split():
+    long = " ".join(f"w{i:03d}" for i in range(500))  # 2499 characters
+    chunks = list(iter_segment_chunks([segment("intro", 0.0), segment(long, 1.0, 100.0), segment("outro", 101.0)]))
+
+    assert all(len(chunk.page_content) <= CHUNK_SIZE for chunk in chunks)
+    words = [word for chunk in chunks for word in chunk.page_content.split()]
+    assert words[0] == "intro" and words[-1] == "outro"
+    assert set(long.split()) <= set(words)
+    starts = [chunk.metadata["start"] for chunk in chunks]
+    assert starts == sorted(starts)
+    assert chunks[-1].metadata["end"] == 102.0
+
+
+def test_split_segment_shares_out_the_time_range():
+    pieces = list(split_segment("aaaa bbbb cccc dddd", 10.0, 29.0, 9))
+
+    assert [text for text, _, _ in pieces] == ["aaaa bbbb", "cccc dddd"]
+    assert pieces[0][1] == 10.0
+    assert pieces[-1][2] == 29.0
+    assert pieces[0][2] == pieces[1][1]
+
+
+def test_chunks_overlap():
+    segments = [segment(f"sentence number {i} of the talk", float(i)) for i in range(200)]
+    chunks = list(iter_segment_chunks(segments))
+
+    assert len(chunks) > 1
+    assert all(len(chunk.page_content) <= CHUNK_SIZE for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.metadata["start"] < previous.metadata["end"]
+        overlap = previous.page_content[-CHUNK_OVERLAP // 2:]
+        assert overlap in current.page_content
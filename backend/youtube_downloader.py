@@ -1,43 +1,76 @@
 import yt_dlp
+import shutil
 import os
+from functools import lru_cache
 from pathlib import Path
 
-def download_video(url: str, output_path: str = "downloads",progress_hook=None) -> dict:
+
+@lru_cache(maxsize=1)
+def ffmpeg_available() -> bool:
+    """Whether FFmpeg is on the PATH (checked once, before any download starts)"""
+    return shutil.which("ffmpeg") is not None
+
+
+def _base_options(output_path: str, progress_hook=None, concurrent_fragments: int = 4) -> dict:
+    return {
+        'outtmpl': f'{output_path}/%(title)s.%(ext)s',
+        'progress_hooks': [progress_hook] if progress_hook else [],
+        # Resume from the .part file an interrupted download left behind
+        'continuedl': True,
+        # DASH/HLS formats come in fragments; fetch several at once
+        'concurrent_fragment_downloads': concurrent_fragments,
+        'retries': 10,
+        'fragment_retries': 10,
+        'quiet': True,
+        'noprogress': True,
+    }
+
+
+def _downloaded_path(ydl, info: dict) -> str:
+    """Final file path, after any post-processing changed the extension"""
+    downloads = info.get('requested_downloads') or []
+    if downloads and downloads[0].get('filepath'):
+        return downloads[0]['filepath']
+    return ydl.prepare_filename(info)
+
+
+def _download(url: str, ydl_opts: dict) -> dict:
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # Extract metadata once and hand the same result to the downloader
+        # instead of letting ydl.download() fetch it a second time
+        info = ydl.extract_info(url, download=False)
+        info = ydl.process_ie_result(info, download=True)
+        return {
+            'title': info.get('title', 'Unknown'),
+            'file_path': _downloaded_path(ydl, info),
+        }
+
+
+def download_video(url: str, output_path: str = "downloads", progress_hook=None, concurrent_fragments: int = 4) -> dict:
     """
     Download video from YouTube URL
     
     Args:
         url (str): YouTube video URL
         output_path (str): Directory to save the video
+        progress_hook (callable): yt-dlp progress hook
+        concurrent_fragments (int): Fragments downloaded in parallel
         
     Returns:
         dict: Status and file information
     """
     try:
         # Create download directory if it doesn't exist
-        Path(output_path).mkdir(exist_ok=True)
+        Path(output_path).mkdir(parents=True, exist_ok=True)
         
         # yt-dlp options for video download
         ydl_opts = {
+            **_base_options(output_path, progress_hook, concurrent_fragments),
             'format': 'best[height<=720]',  # 720p quality
-            'outtmpl': f'{output_path}/%(title)s.%(ext)s',
-            'progress_hooks': [progress_hook] if progress_hook else [],
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract video info
-            info = ydl.extract_info(url, download=False)
-            title = info.get('title', 'Unknown')
-            
-            # Download the video
-            ydl.download([url])
-            
-            return {
-                'status': 'success',
-                'title': title,
-                'file_path': f"{output_path}/{title}.mp4",
-                'type': 'video'
-            }
+        result = _download(url, ydl_opts)
+        return {'status': 'success', **result, 'type': 'video'}
             
     except Exception as e:
         return {
@@ -45,71 +78,44 @@ def download_video(url: str, output_path: str = "downloads",progress_hook=None)
             'error': str(e)
         }
     
-def download_audio(url: str, output_path: str = "downloads", progress_hook=None) -> dict:
+def download_audio(url: str, output_path: str = "downloads", progress_hook=None, concurrent_fragments: int = 4, convert: bool = True) -> dict:
     """
     Download audio from YouTube URL
     
+    Converts to MP3 when FFmpeg is available; otherwise keeps the best audio
+    format as downloaded. FFmpeg is checked before downloading so a missing
+    FFmpeg never costs a second download.
+    
     Args:
         url (str): YouTube video URL
         output_path (str): Directory to save the audio
+        progress_hook (callable): yt-dlp progress hook
+        concurrent_fragments (int): Fragments downloaded in parallel
+        convert (bool): Convert to MP3; pass False when the file is only decoded again
         
     Returns:
         dict: Status and file information
     """
     try:
         # Create download directory if it doesn't exist
-        Path(output_path).mkdir(exist_ok=True)
+        Path(output_path).mkdir(parents=True, exist_ok=True)
         
-        # First try with FFmpeg conversion to MP3
         ydl_opts = {
+            **_base_options(output_path, progress_hook, concurrent_fragments),
             'format': 'bestaudio/best',
-            'outtmpl': f'{output_path}/%(title)s.%(ext)s',
-            'postprocessors': [{
+        }
+        if convert and ffmpeg_available():
+            ydl_opts['postprocessors'] = [{
                 'key': 'FFmpegExtractAudio',
                 'preferredcodec': 'mp3',
                 'preferredquality': '192',
-            }],
-            'progress_hooks': [progress_hook] if progress_hook else [],
-        }
+            }]
         
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extract video info
-                info = ydl.extract_info(url, download=False)
-                title = info.get('title', 'Unknown')
-                
-                # Download and convert to audio
-                ydl.download([url])
-                
-                return {
-                    'status': 'success',
-                    'title': title,
-                    'file_path': f"{output_path}/{title}.mp3",
-                    'type': 'audio'
-                }
-        
-        except Exception as ffmpeg_error:
-            # Fallback: Download best audio format without conversion
-            print("FFmpeg not found, downloading best audio format without conversion...")
-            ydl_opts_fallback = {
-                'format': 'bestaudio/best',
-                'outtmpl': f'{output_path}/%(title)s.%(ext)s',
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts_fallback) as ydl:
-                info = ydl.extract_info(url, download=False)
-                title = info.get('title', 'Unknown')
-                ext = info.get('ext', 'webm')  # Usually webm or m4a
-                
-                ydl.download([url])
-                
-                return {
-                    'status': 'success',
-                    'title': title,
-                    'file_path': f"{output_path}/{title}.{ext}",
-                    'type': 'audio',
-                    'note': 'Downloaded in original format (FFmpeg not available for MP3 conversion)'
-                }
+        result = _download(url, ydl_opts)
+        result = {'status': 'success', **result, 'type': 'audio'}
+        if convert and not ffmpeg_available():
+            result['note'] = 'Downloaded in original format (FFmpeg not available for MP3 conversion)'
+        return result
             
     except Exception as e:
         return {
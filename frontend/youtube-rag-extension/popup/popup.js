@@ -86,11 +86,18 @@ async function processCurrentVideo() {
     const response = await fetch(`${API_BASE_URL}/process_video`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ video_id: currentVideoId }),
+      body: JSON.stringify({ video_id: currentVideoId, background: true }),
     });
     
     if (response.ok) {
       const data = await response.json();
+      if (data.job_id) {
+        // Long videos become chat-ready before the whole transcript is indexed
+        await waitForJob(data.job_id, () => {
+          isProcessed = true;
+          enableChat();
+        });
+      }
       isProcessed = true;
     //   addMessage('system', data.message);
       updateStatus('Processing complete. Ready to chat!', 'processing');
@@ -109,6 +116,38 @@ async function processCurrentVideo() {
   }
 }
 
+// Polls a background processing job until it completes or fails,
+// calling onReady once the video can already be chatted with
+async function waitForJob(jobId, onReady) {
+  let ready = false;
+  while (true) {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+    if (!response.ok) {
+      throw new Error('Lost track of the processing job.');
+    }
+    
+    const job = await response.json();
+    if (job.status === 'completed') return;
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Failed to process video');
+    }
+    
+    if (job.progress.chat_ready && !ready) {
+      ready = true;
+      onReady();
+    }
+    
+    if (job.stage === 'embedding' && job.progress.total) {
+      const prefix = ready ? 'Ready to chat. Still indexing' : 'Embedding transcript';
+      updateStatus(`${prefix}... ${job.progress.embedded}/~${job.progress.total} chunks`, 'processing');
+    } else if (job.stage === 'fetching_transcript') {
+      updateStatus('Fetching transcript...', 'processing');
+    }
+    
+    await new Promise(resolve => setTimeout(resolve, 1000));
+  }
+}
+
 // Sends a user's chat message to the backend
 async function sendMessage() {
   const message = messageInput.value.trim();
@@ -120,20 +159,44 @@ async function sendMessage() {
   disableChat();
   
   try {
-    const response = await fetch(`${API_BASE_URL}/chat`, {
+    const response = await fetch(`${API_BASE_URL}/chat/stream`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ video_id: currentVideoId, query: message }),
+      body: JSON.stringify({
+        video_id: currentVideoId,
+        query: message,
+        session_id: await getSessionId(currentVideoId)
+      }),
     });
     
-    if (response.ok) {
-      const data = await response.json();
-      const formatted_data = marked.parse(data.response);
-      addMessage('assistant', formatted_data);
-    } else {
+    if (!response.ok) {
       const errorData = await response.json();
       throw new Error(errorData.detail || 'Failed to get response');
     }
+    
+    // Render tokens as they arrive instead of waiting for the full answer
+    let answer = '';
+    let messageDiv = null;
+    let sources = [];
+    await readEventStream(response, (event, data) => {
+      if (event === 'retrieval') {
+        sources = data.sources || [];
+      } else if (event === 'token') {
+        if (!messageDiv) {
+          showLoading(false);
+          messageDiv = addMessage('assistant', '');
+        }
+        answer += data.token;
+        messageDiv.innerHTML = marked.parse(answer);
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+      } else if (event === 'error') {
+        throw new Error(data.detail);
+      }
+    });
+    
+    if (messageDiv) {
+      messageDiv.innerHTML += formatSources(sources);
+    }
   } catch (error) {
     console.error('Error sending message:', error);
     addMessage('error', `Error: ${error.message}`);
@@ -146,8 +209,66 @@ async function sendMessage() {
 
 // --- Helper Functions ---
 
+// Renders source chunks as links that seek the video to their start time
+function formatSources(sources) {
+  const timed = sources.filter(source => source.start !== null && source.start !== undefined);
+  if (!timed.length) return '';
+  
+  const links = timed
+    .sort((a, b) => a.start - b.start)
+    .map(source => {
+      const seconds = Math.floor(source.start);
+      const label = `${Math.floor(seconds / 60)}:${String(seconds % 60).padStart(2, '0')}`;
+      return `<a href="#" class="timestamp-link" data-start="${seconds}">${label}</a>`;
+    });
+  return `<div class="sources">Sources: ${links.join(' ')}</div>`;
+}
+
+// Seeks the YouTube tab to the clicked source timestamp
+async function seekTo(seconds) {
+  const [tab] = await chrome.tabs.query({ active: true, currentWindow: true });
+  if (!tab || !currentVideoId) return;
+  await chrome.tabs.update(tab.id, {
+    url: `https://www.youtube.com/watch?v=${currentVideoId}&t=${seconds}s`
+  });
+}
+
+// Reads a server-sent event stream from a fetch response
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      
+      let event = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      });
+      onEvent(event, data ? JSON.parse(data) : {});
+    }
+  }
+}
+
 function setupEventListeners() {
   sendButton.addEventListener('click', sendMessage);
+  messagesContainer.addEventListener('click', (e) => {
+    const link = e.target.closest('.timestamp-link');
+    if (link) {
+      e.preventDefault();
+      seekTo(Number(link.dataset.start));
+    }
+  });
   messageInput.addEventListener('keydown', (e) => {
     if (e.key === 'Enter' && !e.shiftKey) {
       e.preventDefault();
@@ -203,6 +324,18 @@ async function storeCurrentMessages(videoId) {
   await chrome.storage.local.set({ [key]: messages });
 }
 
+// One conversation per video, kept across popup openings so follow-up questions have context
+async function getSessionId(videoId) {
+  const key = `session_${videoId}`;
+  const result = await chrome.storage.local.get([key]);
+  if (result[key]) {
+    return result[key];
+  }
+  const sessionId = crypto.randomUUID();
+  await chrome.storage.local.set({ [key]: sessionId });
+  return sessionId;
+}
+
 function updateStatus(message, type = 'info') {
   statusBar.textContent = message;
   statusBar.className = `status-bar ${type}`;